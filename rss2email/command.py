@@ -29,17 +29,41 @@
 """rss2email commands
 """
 
+import concurrent.futures as _futures
+import contextlib as _contextlib
+import itertools as _itertools
 import os as _os
 import re as _re
 import sys as _sys
-import xml.dom.minidom as _minidom
-import xml.sax.saxutils as _saxutils
+import threading as _threading
 import urllib as _urllib
 import time as _time
 
 from . import LOG as _LOG
+from . import email as _email
 from . import error as _error
 
+_NAME_SLUG_REGEXP = _re.compile(r'[^\w.-]+')
+
+def _round_robin(items, key):
+    """Interleave `items` so that items with the same key are spread out.
+
+    Items are grouped by key, and then one item is taken from each
+    group in turn.  The order within each group is preserved.
+
+    >>> _round_robin(['a1', 'a2', 'b1', 'c1', 'b2', 'a3'], key=lambda x: x[0])
+    ['a1', 'b1', 'c1', 'a2', 'b2', 'a3']
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    missing = object()
+    return [
+        item
+        for items in _itertools.zip_longest(*groups.values(), fillvalue=missing)
+        for item in items
+        if item is not missing]
+
 def new(feeds, args):
     "Create a new feed database."
     if args.email:
@@ -71,33 +95,88 @@ def add(feeds, args):
 
 def run(feeds, args):
     "Fetch feeds and send entry emails."
-    if not args.index:
-        args.index = range(len(feeds))
     try:
+        if args.index:
+            run_feeds = [feeds.index(index) for index in args.index]
+        else:
+            # paused feeds would be skipped below anyway
+            run_feeds = [feed for feed in feeds if feed.active]
+
         # How long (in seconds) to sleep between running feeds with
         # the same server.
         interval = float(feeds.config['DEFAULT']['same-server-fetch-interval'])
 
         # We use the domain name to determine if we are fetching from
-        # the same server twice in a row.
-        last_server = "example.com"
-        for index in args.index:
-            feed = feeds.index(index)
-            # to debug feeds that timeout, run "r2e -VV run"
-            _LOG.info('refreshing feed {}'.format(feed))
-            if feed.active:
-                current_server = _urllib.parse.urlparse(feed.url).netloc
+        # the same server again, and remember when we last finished
+        # fetching from each server so we only sleep for whatever part
+        # of the interval has not already passed.
+        servers = {
+            id(feed): _urllib.parse.urlparse(feed.url).netloc
+            for feed in run_feeds if feed.active}
+        if interval > 0:
+            run_feeds = _round_robin(
+                run_feeds, key=lambda feed: servers.get(id(feed)))
+        last_fetch = {}
+        # Fetches from the same server are serialized, so the interval
+        # still applies when fetching in parallel.
+        server_locks = {}
+        if interval > 0:
+            server_locks = {
+                server: _threading.Lock() for server in servers.values()}
+
+        def fetch(feed):
+            current_server = servers[id(feed)]
+            with server_locks.get(current_server, _contextlib.nullcontext()):
+                if current_server in last_fetch:
+                    delay = (last_fetch[current_server] + interval
+                             - _time.monotonic())
+                    if delay > 0:
+                        _LOG.info(
+                            'fetching from server %s again, '
+                            'sleeping for %ss', current_server, delay)
+                        _time.sleep(delay)
                 try:
-                    if last_server == current_server:
-                        _LOG.info('fetching from server {current_server} again, sleeping for {interval}s'.format(
-                            current_server = current_server,
-                            interval = interval
-                        ))
-                        _time.sleep(interval)
-                    feed.run(send=args.send, clean=args.clean)
-                except _error.RSS2EmailError as e:
-                    e.log()
-                last_server = current_server
+                    return feed.fetch(clean=args.clean)
+                finally:
+                    last_fetch[current_server] = _time.monotonic()
+
+        fetch_threads = int(feeds.config['DEFAULT']['fetch-threads'])
+        fetched = {}
+        with _contextlib.ExitStack() as stack:
+            stack.enter_context(_email.Session())
+            if fetch_threads > 1:
+                # Only the fetching is done in parallel.  Feeds are
+                # processed (and their entries sent) below, in order.
+                pool = stack.enter_context(_futures.ThreadPoolExecutor(
+                    max_workers=fetch_threads,
+                    thread_name_prefix='rss2email-fetch'))
+                fetched = {
+                    id(feed): pool.submit(fetch, feed)
+                    for feed in run_feeds if feed.active and feed.to}
+
+                def cancel_fetches():
+                    # don't keep fetching if we stopped early
+                    for future in fetched.values():
+                        future.cancel()
+                stack.callback(cancel_fetches)
+            for feed in run_feeds:
+                # to debug feeds that timeout, run "r2e -VV run"
+                _LOG.info('refreshing feed %s', feed)
+                if feed.active:
+                    try:
+                        parsed = None
+                        if feed.to:
+                            # drop the future once used, so finished
+                            # feeds don't stay parsed in memory
+                            future = fetched.pop(id(feed), None)
+                            if future is None:
+                                parsed = fetch(feed)
+                            else:
+                                parsed = future.result()
+                        feed.run(
+                            send=args.send, clean=args.clean, parsed=parsed)
+                    except _error.RSS2EmailError as e:
+                        e.log()
     finally:
         feeds.save_feeds()
 
@@ -120,7 +199,7 @@ def _set_active(feeds, args, active=True):
         args.index = range(len(feeds))
     for index in args.index:
         feed = feeds.index(index)
-        _LOG.info('{} feed {}'.format(action, feed))
+        _LOG.info('%s feed %s', action, feed)
         feed.active = active
     feeds.save_config()
 
@@ -139,7 +218,7 @@ def delete(feeds, args):
         feed = feeds.index(index)
         to_remove.append(feed)
     for feed in to_remove:
-        _LOG.info('deleting feed {}'.format(feed))
+        _LOG.info('deleting feed %s', feed)
         feeds.remove(feed)
     feeds.save_config()
     feeds.save_feeds()
@@ -150,36 +229,52 @@ def reset(feeds, args):
         args.index = range(len(feeds))
     for index in args.index:
         feed = feeds.index(index)
-        _LOG.info('resetting feed {}'.format(feed))
+        _LOG.info('resetting feed %s', feed)
         feed.reset()
     feeds.save_feeds()
 
 def opmlimport(feeds, args):
     "Import configuration from OPML."
+    # Only needed here, so keep them out of every other command's startup.
+    import urllib.request as _urllib_request
+    try:
+        # Refuses entity declarations and other XML attack vectors.
+        import defusedxml.ElementTree as _ElementTree
+    except ImportError:
+        import xml.etree.ElementTree as _ElementTree
+
     if args.file:
         _LOG.info('importing feeds from {}'.format(args.file))
-        f = open(args.file, 'rb')
+        if args.file.startswith(('http://', 'https://')):
+            timeout = feeds.config.getint('DEFAULT', 'feed-timeout')
+            try:
+                f = _urllib_request.urlopen(args.file, timeout=timeout)
+            except Exception as e:
+                raise _error.OPMLReadError() from e
+        else:
+            f = open(args.file, 'rb')
     else:
         _LOG.info('importing feeds from stdin')
-        f = _sys.stdin
+        f = _sys.stdin.buffer
+    new_feeds = []
     try:
-        dom = _minidom.parse(f)
-        new_feeds = dom.getElementsByTagName('outline')
+        for event, element in _ElementTree.iterparse(f, events=('end',)):
+            if element.tag.rsplit('}', 1)[-1] != 'outline':
+                continue
+            url = element.get('xmlUrl')
+            if url is not None:
+                new_feeds.append((url, element.get('text')))
+            element.clear()
     except Exception as e:
         raise _error.OPMLReadError() from e
     if args.file:
         f.close()
-    name_slug_regexp = _re.compile(r'[^\w\d.-]+')
-    for feed in new_feeds:
-        if feed.hasAttribute('xmlUrl'):
-            url = _saxutils.unescape(feed.getAttribute('xmlUrl'))
-            name = None
-            if feed.hasAttribute('text'):
-                text = _saxutils.unescape(feed.getAttribute('text'))
-                if text != url:
-                    name = name_slug_regexp.sub('-', text)
-            feed = feeds.new_feed(name=name, url=url)
-            _LOG.info('add new feed {}'.format(feed))
+    for url, text in new_feeds:
+        name = None
+        if text is not None and text != url:
+            name = _NAME_SLUG_REGEXP.sub('-', text)
+        feed = feeds.new_feed(name=name, url=url)
+        _LOG.info('add new feed %s', feed)
     feeds.save_config()
     feeds.save_feeds()
 
@@ -187,27 +282,27 @@ def opmlexport(feeds, args):
     "Export configuration to OPML."
     if args.file:
         _LOG.info('exporting feeds to {}'.format(args.file))
-        f = open(args.file, 'wb')
+        # A large buffer lets the whole export go out in a few writes.
+        f = open(args.file, 'wb', buffering=1 << 20)
     else:
         _LOG.info('exporting feeds to stdout')
         f = _sys.stdout.buffer
-    f.write(
+    parts = [
         b'<?xml version="1.0" encoding="UTF-8"?>\n'
         b'<opml version="1.0">\n'
         b'<head>\n'
         b'<title>rss2email OPML export</title>\n'
         b'</head>\n'
-        b'<body>\n')
+        b'<body>\n']
     for feed in feeds:
         if not feed.url:
-            _LOG.debug('dropping {}'.format(feed))
+            _LOG.debug('dropping %s', feed)
             continue
-        name = _saxutils.escape(feed.name)
-        url = _saxutils.escape(feed.url)
-        f.write('<outline type="rss" text="{}" xmlUrl="{}"/>\n'.format(
-                name, url).encode())
-    f.write(
+        parts.append('<outline type="rss" text="{}" xmlUrl="{}"/>\n'.format(
+                feed.escaped_name, feed.escaped_url).encode())
+    parts.append(
         b'</body>\n'
         b'</opml>\n')
+    f.writelines(parts)
     if args.file:
         f.close()
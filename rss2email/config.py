@@ -48,43 +48,227 @@
 """Per-user rss2email configuration
 """
 
-import collections as _collections
 import configparser as _configparser
+import re as _re
+
+
+_LIST_SEPARATOR_REGEXP = _re.compile(r'\s*,\s*')
+
+def _to_tuple(value):
+    return tuple(_LIST_SEPARATOR_REGEXP.split(value.strip()))
+
+def _to_boolean(value):
+    try:
+        return _configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
+    except KeyError:
+        raise ValueError('Not a boolean: {}'.format(value)) from None
+
+def _section_snapshot(config, section):
+    "Flatten `section` (merged with DEFAULT) into a plain dict"
+    return dict(config.items(section))
+
+def _html2text_options(config, section):
+    # hack to prevent breaking the default in every existing config file
+    body_width = config.int_of(section, 'body-width')
+    return {
+        'unicode_snob': config.bool_of(section, 'unicode-snob'),
+        'links_each_paragraph': config.bool_of(
+            section, 'links-after-each-paragraph'),
+        'inline_links': config.bool_of(section, 'inline-links'),
+        'wrap_links': config.bool_of(section, 'wrap-links'),
+        'body_width': (
+            0 if body_width < 0 else 78 if body_width == 0 else body_width),
+        }
 
-import html2text as _html2text
 
 class Config (_configparser.ConfigParser):
-    def __init__(self, dict_type=_collections.OrderedDict,
+    def __init__(self, dict_type=dict,
                  interpolation=None,
                  **kwargs):
+        self._cache = {}
         super(Config, self).__init__(
             dict_type=dict_type, interpolation=interpolation, **kwargs)
 
+    def get_cached(self, section, builder):
+        """Return ``builder(self, section)``, memoized per configuration
+
+        The cache is cleared whenever the configuration changes, so
+        builders can do their parsing once and have the result reused
+        until then.
+
+        >>> config = Config()
+        >>> config.read_dict({'DEFAULT': {'digest': 'False'}})
+        >>> def digest(config, section):
+        ...     print('parsing')
+        ...     return config.getboolean(section, 'digest')
+        >>> config.get_cached('DEFAULT', digest)
+        parsing
+        False
+        >>> config.get_cached('DEFAULT', digest)
+        False
+        >>> config.set('DEFAULT', 'digest', 'True')
+        >>> config.get_cached('DEFAULT', digest)
+        parsing
+        True
+        """
+        key = (section, builder)
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = builder(self, section)
+            return value
+
+    def _clear_cache(self):
+        self._cache.clear()
+
+    def str_of(self, section, option):
+        """Return a raw option value from a flat snapshot of `section`
+
+        Like ``get``, but a single dictionary lookup once the section
+        has been snapshotted.
+
+        >>> config = Config()
+        >>> config.read_dict({
+        ...     'DEFAULT': {'digest': 'False', 'body-width': '0'},
+        ...     'feed.a': {'digest': 'yes'}})
+        >>> config.str_of('feed.a', 'body-width')
+        '0'
+        >>> config.bool_of('feed.a', 'digest')
+        True
+        >>> config.int_of('DEFAULT', 'body-width')
+        0
+        >>> config.str_of('feed.a', 'missing')
+        Traceback (most recent call last):
+          ...
+        configparser.NoOptionError: No option 'missing' in section: 'feed.a'
+        """
+        try:
+            return self.get_cached(section, _section_snapshot)[option]
+        except KeyError:
+            raise _configparser.NoOptionError(option, section) from None
+
+    def bool_of(self, section, option):
+        "Like ``getboolean``, but using the snapshot from `str_of`"
+        return self._converted_of(section, option, _to_boolean)
+
+    def int_of(self, section, option):
+        "Like ``getint``, but using the snapshot from `str_of`"
+        return self._converted_of(section, option, int)
+
+    def tuple_of(self, section, option):
+        """Split a comma-separated option, using the snapshot from `str_of`
+
+        >>> config = Config()
+        >>> config.read_dict({'DEFAULT': {'encodings': ' US-ASCII ,UTF-8'}})
+        >>> config.tuple_of('DEFAULT', 'encodings')
+        ('US-ASCII', 'UTF-8')
+        """
+        return self._converted_of(section, option, _to_tuple)
+
+    def _converted_of(self, section, option, convert):
+        # Converted values are kept in the same cache as the
+        # snapshots, so each option is only parsed once.
+        key = (section, option, convert)
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = convert(self.str_of(section, option))
+            return value
+
+    def read(self, *args, **kwargs):
+        try:
+            return super(Config, self).read(*args, **kwargs)
+        finally:
+            self._clear_cache()
+
+    def read_file(self, *args, **kwargs):
+        try:
+            return super(Config, self).read_file(*args, **kwargs)
+        finally:
+            self._clear_cache()
+
+    def read_dict(self, *args, **kwargs):
+        try:
+            return super(Config, self).read_dict(*args, **kwargs)
+        finally:
+            self._clear_cache()
+
+    def set(self, *args, **kwargs):
+        try:
+            return super(Config, self).set(*args, **kwargs)
+        finally:
+            self._clear_cache()
+
+    def add_section(self, *args, **kwargs):
+        try:
+            return super(Config, self).add_section(*args, **kwargs)
+        finally:
+            self._clear_cache()
+
+    def remove_option(self, *args, **kwargs):
+        try:
+            return super(Config, self).remove_option(*args, **kwargs)
+        finally:
+            self._clear_cache()
+
+    def remove_section(self, *args, **kwargs):
+        try:
+            return super(Config, self).remove_section(*args, **kwargs)
+        finally:
+            self._clear_cache()
+
+    def html2text_options(self, section='DEFAULT'):
+        """Return the html2text.HTML2Text attributes for `section`
+
+        The options are parsed once per configuration (see
+        `get_cached`), so converters can be configured directly
+        instead of going through the html2text globals.
+
+        >>> config = Config()
+        >>> config.read_dict({'DEFAULT': {
+        ...     'unicode-snob': 'True',
+        ...     'links-after-each-paragraph': 'False',
+        ...     'inline-links': 'True',
+        ...     'wrap-links': 'True',
+        ...     'body-width': '-1'}})
+        >>> options = config.html2text_options()
+        >>> sorted(options.items())  # doctest: +NORMALIZE_WHITESPACE
+        [('body_width', 0), ('inline_links', True),
+         ('links_each_paragraph', False), ('unicode_snob', True),
+         ('wrap_links', True)]
+        >>> config.html2text_options('missing') is options
+        True
+        """
+        if section not in self:
+            section = 'DEFAULT'
+        return self.get_cached(section, _html2text_options)
+
     def setup_html2text(self, section='DEFAULT'):
         """Setup html2text globals to match our configuration
 
         Html2text unfortunately uses globals (instead of keyword
-        arguments) to configure its conversion.
+        arguments) to configure its conversion.  rss2email itself
+        configures its converters with `html2text_options` and never
+        calls this; it is kept for external code (e.g. post-process
+        hooks) that calls ``html2text.html2text()`` directly.
         """
-        if section not in self:
-            section = 'DEFAULT'
-        _html2text.config.UNICODE_SNOB = self.getboolean(
-            section, 'unicode-snob')
-        _html2text.config.LINKS_EACH_PARAGRAPH = self.getboolean(
-            section, 'links-after-each-paragraph')
-        _html2text.config.INLINE_LINKS = self.getboolean(
-            section, 'inline-links')
-        _html2text.config.WRAP_LINKS = self.getboolean(
-            section, 'wrap-links')
-        # hack to prevent breaking the default in every existing config file
-        body_width = self.getint(section, 'body-width')
-        _html2text.config.BODY_WIDTH = 0 if body_width < 0 else 78 if body_width == 0 else body_width
+        # Imported here so commands that never convert HTML (list,
+        # delete, ...) don't pay for it at startup.
+        import html2text as _html2text
+
+        options = self.html2text_options(section=section)
+        _html2text.config.UNICODE_SNOB = options['unicode_snob']
+        _html2text.config.LINKS_EACH_PARAGRAPH = options[
+            'links_each_paragraph']
+        _html2text.config.INLINE_LINKS = options['inline_links']
+        _html2text.config.WRAP_LINKS = options['wrap_links']
+        _html2text.config.BODY_WIDTH = options['body_width']
 
 
 CONFIG = Config()
 
 # setup defaults for feeds that don't customize
-CONFIG['DEFAULT'] = _collections.OrderedDict((
+CONFIG['DEFAULT'] = dict((
         ### Addressing
         # The email address messages are from by default
         ('from', 'user@rss2email.invalid'),
@@ -114,6 +298,10 @@ CONFIG['DEFAULT'] = _collections.OrderedDict((
         ('feed-timeout', str(60)),
         # Set the sleep interval (in seconds) between consecutive fetches from the same server
         ('same-server-fetch-interval', str(0)),
+        # Number of feeds fetched in parallel by `r2e run`.  Feeds from
+        # the same server are still fetched one after the other when
+        # same-server-fetch-interval is set.
+        ('fetch-threads', str(1)),
 
         ### Processing
         # True: Fetch, process, and email feeds.
@@ -148,6 +336,10 @@ CONFIG['DEFAULT'] = _collections.OrderedDict((
         # If 'trust-guid' or 'trust-link' is True, this setting allows to receive
         # a new email message in reply to the previous one when the post changes.
         ('reply-changes', str(False)),
+        # Only process the first (usually newest) N entries of a feed,
+        # 0 processes them all.  Useful for feeds that always list
+        # their whole history.
+        ('max-entries', str(0)),
         # To most correctly encode emails with international
         # characters, we iterate through the list below and use the
         # first character set that works.
@@ -227,10 +419,14 @@ CONFIG['DEFAULT'] = _collections.OrderedDict((
         ### Mailing
         # Select protocol from: sendmail, smtp, lmtp, imap
         ('email-protocol', 'sendmail'),
-        # True: Use SMTP_SERVER to send mail.
+        # Number of messages of a feed sent in parallel.
+        ('send-threads', str(1)),
         # Sendmail (or compatible) configuration
         ('sendmail', '/usr/sbin/sendmail'),  # Path to sendmail (or compatible)
         ('sendmail_config', ''),
+        # True: Deliver all the messages of a run through a single
+        # `sendmail -bs` process instead of one process per message.
+        ('sendmail-batch', str(False)),
         # SMTP configuration
         ('smtp-auth', str(False)),      # set to True to use SMTP AUTH
         ('smtp-username', 'username'),  # username for SMTP AUTH
@@ -33,7 +33,11 @@
 """Email message generation and dispatching
 """
 
+import codecs as _codecs
+import collections as _collections
+import concurrent.futures as _futures
 import email as _email
+import functools as _functools
 from email.charset import Charset as _Charset
 import email.encoders as _email_encoders
 from email.generator import BytesGenerator as _BytesGenerator
@@ -49,19 +53,361 @@ from email.utils import getaddresses as _getaddresses
 import imaplib as _imaplib
 import io as _io
 import smtplib as _smtplib
+import socket as _socket
 import ssl as _ssl
 import subprocess as _subprocess
-import sys as _sys
+import threading as _threading
 import time as _time
 import os as _os
-
-import html2text
+import re as _re
 
 from . import LOG as _LOG
 from . import config as _config
 from . import error as _error
 
 
+# Per-section settings, parsed once per configuration with
+# `Config.get_cached` instead of on every message.
+_MessageSettings = _collections.namedtuple(
+    '_MessageSettings',
+    ['protocol', 'encodings', 'header_encodings', 'bonus_headers',
+     'use_8bit', 'multipart_html'])
+
+def _message_settings(config, section):
+    encodings = config.tuple_of(section, 'encodings')
+    header_encodings = ('US-ASCII',) + encodings
+    return _MessageSettings(
+        protocol=config.get(section, 'email-protocol'),
+        encodings=encodings,
+        header_encodings=header_encodings,
+        bonus_headers=_bonus_headers(
+            config.get(section, 'bonus-header'), header_encodings),
+        use_8bit=config.getboolean(section, 'use-8bit'),
+        multipart_html=config.getboolean(section, 'multipart-html'))
+
+def _bonus_headers(bonus_header, encodings):
+    """Parse and encode the `bonus-header` setting
+
+    >>> headers = _bonus_headers(
+    ...     'Approved: joe@bob.org\\nX-Name: Ζεύς', ('US-ASCII', 'UTF-8'))
+    >>> for key, header in headers.items():
+    ...     print('{}: {}'.format(key, header.encode()))
+    Approved: joe@bob.org
+    X-Name: =?utf-8?b?zpbOtc+Nz4I=?=
+    """
+    headers = {}
+    for header in bonus_header.splitlines():
+        if ':' in header:
+            key,value = header.split(':', 1)
+            value = value.strip()
+            headers[key.strip()] = _Header(
+                value, guess_encoding(value, encodings))
+        else:
+            _LOG.warning('malformed bonus-header: {}'.format(bonus_header))
+    return headers
+
+_SMTPSettings = _collections.namedtuple(
+    '_SMTPSettings',
+    ['server', 'port', 'ssl', 'auth', 'username', 'password', 'sender'])
+
+def _smtp_settings(config, section):
+    """Collect the SMTP settings for `section`
+
+    >>> import rss2email.config
+    >>> config = rss2email.config.Config()
+    >>> config.read_dict(rss2email.config.CONFIG)
+    >>> config.set('DEFAULT', 'smtp-server', 'smtp.example.net:587')
+    >>> settings = config.get_cached('DEFAULT', _smtp_settings)
+    >>> settings.server, settings.port
+    ('smtp.example.net', 587)
+
+    The result is shared by every message until the configuration
+    changes:
+
+    >>> config.get_cached('DEFAULT', _smtp_settings) is settings
+    True
+    >>> config.set('DEFAULT', 'smtp-server', 'smtp.example.org')
+    >>> settings = config.get_cached('DEFAULT', _smtp_settings)
+    >>> settings.server, settings.port
+    ('smtp.example.org', 465)
+    """
+    server = config.get(section, 'smtp-server')
+    # Adding back in support for 'server:port'
+    pos = server.find(':')
+    if 0 <= pos:
+        # Strip port out of server name
+        port = int(server[pos+1:])
+        server = server[:pos]
+    else:
+        port = config.getint(section, 'smtp-port')
+    return _SMTPSettings(
+        server=server,
+        port=port,
+        ssl=config.getboolean(section, 'smtp-ssl'),
+        auth=config.getboolean(section, 'smtp-auth'),
+        username=config.get(section, 'smtp-username'),
+        password=config.get(section, 'smtp-password'),
+        sender=config.get(section, 'from'))
+
+_LMTPSettings = _collections.namedtuple(
+    '_LMTPSettings',
+    ['server', 'port', 'auth', 'username', 'password', 'sender'])
+
+def _lmtp_settings(config, section):
+    return _LMTPSettings(
+        server=config.get(section, 'lmtp-server'),
+        port=config.getint(section, 'lmtp-port'),
+        auth=config.getboolean(section, 'lmtp-auth'),
+        username=config.get(section, 'lmtp-username'),
+        password=config.get(section, 'lmtp-password'),
+        sender=config.get(section, 'from'))
+
+_IMAPSettings = _collections.namedtuple(
+    '_IMAPSettings',
+    ['server', 'port', 'ssl', 'auth', 'username', 'password', 'mailbox'])
+
+def _imap_settings(config, section):
+    return _IMAPSettings(
+        server=config.get(section, 'imap-server'),
+        port=config.getint(section, 'imap-port'),
+        ssl=config.getboolean(section, 'imap-ssl'),
+        auth=config.getboolean(section, 'imap-auth'),
+        username=config.get(section, 'imap-username'),
+        password=config.get(section, 'imap-password'),
+        mailbox=config.get(section, 'imap-mailbox'))
+
+_SendmailSettings = _collections.namedtuple(
+    '_SendmailSettings', ['command', 'batch', 'sender_name', 'sender_addr'])
+
+def _sendmail_settings(config, section):
+    command = [config.get(section, 'sendmail')]
+    sendmail_config = config.get(section, 'sendmail_config')
+    if sendmail_config:
+        command.extend(['-C', sendmail_config])
+    sender_name,sender_addr = _parseaddr(config.get(section, 'from'))
+    return _SendmailSettings(
+        command=tuple(command),
+        batch=config.getboolean(section, 'sendmail-batch'),
+        sender_name=sender_name,
+        sender_addr=sender_addr)
+
+def _maildir_path(config, section):
+    path = config.get(section, 'maildir-path')
+    mailbox = config.get(section, 'maildir-mailbox')
+    return _os.path.join(path, mailbox)
+
+# The innermost active Session, if any.
+_SESSION = None
+
+class Session (object):
+    """Keep mail transports open while sending a batch of messages
+
+    Inside a ``with Session():`` block, transports that support it
+    are opened when the first message needs them and reused for later
+    messages with the same settings.  They are all closed when the
+    block exits.  Outside of a session every message opens and closes
+    its own transport.
+
+    Each thread gets its own transports, so a session can be shared by
+    threads sending in parallel.  Use `executor` for those threads, so
+    they (and their transports) are reused for the whole session.
+    """
+    def __init__(self):
+        self._transports = {}
+        self._executors = {}
+        self._previous = None
+
+    def __enter__(self):
+        global _SESSION
+        self._previous = _SESSION
+        _SESSION = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _SESSION
+        _SESSION = self._previous
+        self._previous = None
+        self.close()
+
+    def transport(self, key, opener):
+        "Return the open transport for `key`, calling `opener` if needed"
+        key = (_threading.get_ident(), key)
+        try:
+            return self._transports[key]
+        except KeyError:
+            transport = self._transports[key] = opener()
+            return transport
+
+    def discard(self, key):
+        "Close and forget the transport for `key`, if any"
+        key = (_threading.get_ident(), key)
+        transport = self._transports.pop(key, None)
+        if transport is not None:
+            _close_transport(transport)
+
+    def executor(self, max_workers):
+        "Return the session's pool of `max_workers` sending threads"
+        try:
+            return self._executors[max_workers]
+        except KeyError:
+            executor = self._executors[max_workers] = (
+                _futures.ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix='rss2email-send'))
+            return executor
+
+    def close(self):
+        while self._executors:
+            max_workers, executor = self._executors.popitem()
+            executor.shutdown()
+        while self._transports:
+            key, transport = self._transports.popitem()
+            _close_transport(transport)
+
+def session():
+    "Return the innermost active `Session`, or None"
+    return _SESSION
+
+def _smtp_disconnected(error):
+    """Return True if `error` means the server closed an SMTP connection
+
+    Besides dropping the connection, servers often time out idle
+    clients with a 421 reply:
+
+    >>> _smtp_disconnected(_smtplib.SMTPServerDisconnected())
+    True
+    >>> _smtp_disconnected(_smtplib.SMTPSenderRefused(
+    ...     421, b'4.4.2 Error: timeout exceeded', 'a@example.com'))
+    True
+    >>> _smtp_disconnected(_smtplib.SMTPRecipientsRefused(
+    ...     {'b@example.com': (421, b'4.4.2 Error: timeout exceeded')}))
+    True
+    >>> _smtp_disconnected(BrokenPipeError())
+    True
+
+    Other errors are about the message itself:
+
+    >>> _smtp_disconnected(_smtplib.SMTPSenderRefused(
+    ...     550, b'5.7.1 Rejected', 'a@example.com'))
+    False
+    >>> _smtp_disconnected(_smtplib.SMTPRecipientsRefused(
+    ...     {'b@example.com': (550, b'5.1.1 Unknown user')}))
+    False
+    """
+    if isinstance(error, _smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    if isinstance(error, _smtplib.SMTPRecipientsRefused):
+        return any(
+            code == 421 for (code, response) in error.recipients.values())
+    if isinstance(error, _smtplib.SMTPException):
+        # SMTPException is an OSError too
+        return isinstance(error, _smtplib.SMTPServerDisconnected)
+    return isinstance(error, OSError)
+
+def _deliver(key, opener, deliver, disconnected=_smtp_disconnected):
+    """Call `deliver(transport)` with a transport for `key`
+
+    Inside a session the transport is reused from (or added to) the
+    session, and a connection the server has dropped in the meantime
+    (when `disconnected(error)` is true for the raised error) is
+    reopened once.  Otherwise a transport is opened with `opener` just
+    for this call.
+
+    >>> class Transport (object):
+    ...     def __init__(self, number):
+    ...         self.number = number
+    ...     def quit(self):
+    ...         print('closing {}'.format(self.number))
+    >>> numbers = iter(range(1, 10))
+    >>> def deliver(transport):
+    ...     if transport.number == 1:
+    ...         raise _smtplib.SMTPSenderRefused(
+    ...             421, b'4.4.2 Error: timeout exceeded', 'a@example.com')
+    ...     return transport.number
+    >>> with Session():
+    ...     _deliver(
+    ...         key=('test',), opener=lambda: Transport(next(numbers)),
+    ...         deliver=deliver)
+    closing 1
+    2
+    closing 2
+    """
+    if _SESSION is None:
+        transport = opener()
+        try:
+            return deliver(transport)
+        finally:
+            _close_transport(transport)
+    for retry in (True, False):
+        transport = _SESSION.transport(key, opener)
+        try:
+            return deliver(transport)
+        except BaseException as e:
+            _SESSION.discard(key)
+            if not (retry and disconnected(e)):
+                raise
+            _LOG.debug('reconnecting to %s: %s', key[0], e)
+
+def _close_transport(transport):
+    if isinstance(transport, _imaplib.IMAP4):
+        # logout() also shuts the connection down if LOGOUT fails
+        transport.logout()
+        return
+    try:
+        transport.quit()
+    except Exception as e:
+        _LOG.debug('error closing %r: %s', transport, e)
+        transport.close()
+
+class _SendmailSMTP (_smtplib.SMTP):
+    """SMTP client talking to a local ``sendmail -bs`` process
+
+    This lets a whole batch of messages go through a single sendmail
+    process, instead of starting one for every message.  The sender
+    is passed with ``-F``/``-f`` like for single messages.
+    """
+    def __init__(self, command, sender_name, sender_addr):
+        super(_SendmailSMTP, self).__init__(local_hostname='localhost')
+        self.process = None
+        self.sock, child = _socket.socketpair()
+        try:
+            self.process = _subprocess.Popen(
+                list(command) + [
+                    '-bs', '-F', sender_name, '-f', sender_addr],
+                stdin=child, stdout=child)
+        except:
+            self.sock.close()
+            raise
+        finally:
+            child.close()
+        code, msg = self.getreply()
+        if code != 220:
+            self.close()
+            raise _smtplib.SMTPConnectError(code, msg)
+
+    def close(self):
+        super(_SendmailSMTP, self).close()
+        if self.process is not None:
+            status = self.process.wait()
+            self.process = None
+            if status:
+                _LOG.debug('sendmail -bs exited with status %s', status)
+
+# Encoder functions by encoding name, so guess_encoding() only resolves
+# each name once.
+_ENCODERS = {}
+
+_ASCII_CHARACTERS = ''.join(chr(i) for i in range(128))
+
+@_functools.lru_cache(maxsize=None)
+def _encodes_ascii(encoding):
+    "Whether `encoding` can encode every ASCII string"
+    try:
+        _ASCII_CHARACTERS.encode(encoding)
+    except (UnicodeError, LookupError):
+        return False
+    return True
+
 def guess_encoding(string, encodings=('US-ASCII', 'UTF-8')):
     """Find an encoding capable of encoding `string`.
 
@@ -69,39 +415,97 @@ def guess_encoding(string, encodings=('US-ASCII', 'UTF-8')):
     'US-ASCII'
     >>> guess_encoding('α', encodings=('US-ASCII', 'UTF-8'))
     'UTF-8'
+    >>> guess_encoding('alpha', encodings=('UTF-8', 'US-ASCII'))
+    'UTF-8'
     >>> guess_encoding('α', encodings=('US-ASCII', 'ISO-8859-1'))
     Traceback (most recent call last):
       ...
     rss2email.error.NoValidEncodingError: no valid encoding for α in ('US-ASCII', 'ISO-8859-1')
     """
+    if encodings and string.isascii() and _encodes_ascii(encodings[0]):
+        return encodings[0]
     for encoding in encodings:
         try:
-            string.encode(encoding)
-        except (UnicodeError, LookupError):
+            encoder = _ENCODERS[encoding]
+        except KeyError:
+            try:
+                encoder = _ENCODERS[encoding] = _codecs.getencoder(encoding)
+            except LookupError:
+                continue
+        try:
+            encoder(string)
+        except UnicodeError:
             pass
         else:
             return encoding
     raise _error.NoValidEncodingError(string=string, encodings=encodings)
 
-def _add_plain_multipart(guid: str, message, html: str):
-    headers = message.items()
-    msg = MIMEMultipart('alternative')
-    for name, value in headers:
-        if name.lower().startswith('content-'):
-            continue
-        msg[str(name)] = value
+def _add_plain_multipart(guid: str, message, html: str, options):
+    """Turn the text/html `message` into a multipart/alternative one
+
+    The message is changed in place, keeping its headers where they
+    are.
+
+    >>> message = _MIMEText('<p>Hi</p>', 'html')
+    >>> message['Subject'] = 'Testing'
+    >>> options = _config.CONFIG.html2text_options()
+    >>> message = _add_plain_multipart('', message, '<p>Hi</p>', options)
+    >>> message.items()
+    [('Content-Type', 'multipart/alternative'), ('MIME-Version', '1.0'), ('Subject', 'Testing')]
+    >>> [part.get_content_type() for part in message.get_payload()]
+    ['text/html', 'text/plain']
+
+    Like other multipart messages, it has no charset, so `_flatten`
+    does not try its str fallback on it:
+
+    >>> message.get_charset() is None
+    True
+    >>> message.preamble = 'Ζεύς'
+    >>> _flatten(message)
+    Traceback (most recent call last):
+      ...
+    UnicodeEncodeError: 'ascii' codec can't encode characters in position 0-3: ordinal not in range(128)
+    """
+    del message['Content-Transfer-Encoding']
+    message.replace_header('Content-Type', 'multipart/alternative')
+    # drop the text/html charset (after replacing Content-Type, so the
+    # header keeps its place)
+    message.set_charset(None)
+    message.set_payload(_html_and_plain_parts(guid, html, options))
+    return message
+
+def _html_and_plain_parts(guid: str, html: str, options):
+    """Return the parts of a multipart/alternative message for `html`
+
+    `options` are the `Config.html2text_options` for the text/plain
+    part.
+    """
+    import html2text
 
     html_part = _MIMEText(html, _subtype='html')
-    msg.attach(html_part)
 
-    text_content = html2text.html2text(html=html, baseurl=guid)
-    text_part = _MIMEText(text_content)
-    msg.attach(text_part)
-    return msg
+    # html2text.HTML2Text keeps per-document state (link references,
+    # list and quote nesting, ...) that is not reset between handle()
+    # calls, so a fresh converter is needed for every message.  Its
+    # construction is well under 1% of the conversion time anyway.
+    converter = html2text.HTML2Text(baseurl=guid)
+    for name, value in options.items():
+        setattr(converter, name, value)
+    text_part = _MIMEText(converter.handle(html))
+    return [html_part, text_part]
 
-def message_add_plain_multipart(guid, message, html):
+def message_add_plain_multipart(guid, message, html, config=None,
+                                section='DEFAULT'):
+    """Add a text/plain alternative to the text/html `message`
+
+    A text/html message is converted in place and returned; other
+    messages are returned unchanged.
+    """
+    if config is None:
+        config = _config.CONFIG
     if message.get_content_type() == 'text/html':
-        m = _add_plain_multipart(guid, message, html)
+        m = _add_plain_multipart(
+            guid, message, html, config.html2text_options(section=section))
         return m
     if message.is_multipart():
         # we could support multipart messages, but let's postpone it
@@ -112,6 +516,101 @@ def message_add_plain_multipart(guid, message, html):
         return message
     return message
 
+# A single "Real Name <user@host>" or bare "user@host" address with
+# nothing that needs RFC 2822 parsing (quotes, comments, lists, ...).
+_ADDR_ATOM = r'[^\s<>"(),;:@\\\[\]]+'
+_SIMPLE_ADDR_REGEXP = _re.compile(
+    r'\s*(?:({atom}(?: {atom})*)\s*<({atom}@{atom})>|({atom}@{atom}))\s*\Z'
+    .format(atom=_ADDR_ATOM))
+
+def _split_addresses(addresses):
+    """Split `addresses` into (real name, address) pairs
+
+    Like `email.utils.getaddresses`, but without running the full
+    parser for the common case of a single, simple address.
+
+    >>> _split_addresses('John <jdoe@a.com>')
+    [('John', 'jdoe@a.com')]
+    >>> _split_addresses('jdoe@a.com')
+    [('', 'jdoe@a.com')]
+    >>> _split_addresses('"Doe, John" <jdoe@a.com>, z@olympus.org')
+    [('Doe, John', 'jdoe@a.com'), ('', 'z@olympus.org')]
+    """
+    match = _SIMPLE_ADDR_REGEXP.match(addresses)
+    if match is None:
+        return _getaddresses([addresses])
+    name, addr, bare_addr = match.groups()
+    if bare_addr is not None:
+        return [('', bare_addr)]
+    return [(name, addr)]
+
+@_functools.lru_cache(maxsize=256)
+def _envelope_recipients(recipients):
+    """Return the bare addresses of the comma-separated `recipients`
+
+    Feeds send every message to the same recipients, so the result is
+    cached.
+
+    >>> _envelope_recipients('"Doe, John" <jdoe@a.com>, z@olympus.org')
+    ('jdoe@a.com', 'z@olympus.org')
+    """
+    return tuple(addr for name, addr in _split_addresses(recipients))
+
+@_functools.lru_cache(maxsize=1024)
+def _header(value, encodings):
+    """Return a `Header` for `value` in the first of `encodings` that fits
+
+    Most extra headers (User-Agent, X-RSS-Feed, List-ID, ...) are the
+    same for every entry of a feed, so the headers are cached and
+    shared between messages, like the bonus headers.
+
+    >>> _header('rss2email', ('US-ASCII', 'UTF-8')).encode()
+    'rss2email'
+    >>> _header('Ζεύς', ('US-ASCII', 'UTF-8')).encode()
+    '=?utf-8?b?zpbOtc+Nz4I=?='
+    """
+    return _Header(value, guess_encoding(value, encodings))
+
+@_functools.lru_cache(maxsize=16)
+def _8bit_charset(encoding):
+    "Return a shared `Charset` for `encoding` that leaves bodies 8-bit"
+    charset = _Charset(encoding)
+    charset.body_encoding = _email_encoders.encode_7or8bit
+    return charset
+
+@_functools.lru_cache(maxsize=1024)
+def _encode_addresses(addresses, encodings):
+    """Format the comma-separated `addresses` for an address header
+
+    Real names are encoded with the first of `encodings` that can
+    represent them.  Feeds send every message to the same recipients,
+    so the result is cached.
+
+    >>> _encode_addresses('Ζεύς <z@olympus.org>, a@b.com', ('US-ASCII', 'UTF-8'))
+    '=?utf-8?b?zpbOtc+Nz4I=?= <z@olympus.org>, a@b.com'
+
+    The addresses themselves must be ASCII:
+
+    >>> _encode_addresses('ζ@olympus.org', ('US-ASCII', 'UTF-8'))
+    Traceback (most recent call last):
+      ...
+    UnicodeEncodeError: 'ascii' codec can't encode character '\u03b6' in position 0: ordinal not in range(128)
+    """
+    # Split real name (which is optional) and email address parts
+    address_list = []
+    for name, addr in _split_addresses(addresses):
+        if not name and addr.isascii():
+            # formataddr() would return the bare address anyway
+            address_list.append(addr)
+            continue
+        if name.isascii():
+            # formataddr() only uses the charset for non-ASCII names
+            address_list.append(_formataddr((name, addr)))
+            continue
+        encoding = guess_encoding(name, encodings)
+        address_list.append(_formataddr((name, addr), charset=encoding))
+    return ', '.join(address_list)
+
 def get_message(sender, recipient, subject, body, content_type,
                 extra_headers=None, config=None, section='DEFAULT'):
     """Generate a `Message` instance.
@@ -143,151 +642,256 @@ def get_message(sender, recipient, subject, body, content_type,
     <BLANKLINE>
     Hello, world!
     <BLANKLINE>
+
+    With multipart-html, the text/plain part follows the html2text
+    settings:
+
+    >>> import rss2email.config
+    >>> config = rss2email.config.Config()
+    >>> config.read_dict(rss2email.config.CONFIG)
+    >>> config.set('DEFAULT', 'multipart-html', str(True))
+    >>> config.set('DEFAULT', 'body-width', '-1')
+    >>> config.set('DEFAULT', 'inline-links', str(False))
+    >>> message = get_message(
+    ...     sender='John <jdoe@a.com>', recipient='z@olympus.org',
+    ...     subject='Testing',
+    ...     body='<p>{} <a href="http://example.com/">link</a></p>'.format(
+    ...         ' '.join(['word'] * 20)),
+    ...     content_type='html',
+    ...     config=config)
+    >>> html_part, text_part = message.get_payload()
+    >>> print(text_part.get_payload())  # doctest: +REPORT_UDIFF
+    word word word word word word word word word word word word word word word word word word word word [link][1]
+    <BLANKLINE>
+       [1]: http://example.com/
+    <BLANKLINE>
+    <BLANKLINE>
     """
     if config is None:
         config = _config.CONFIG
-    if section not in config.sections():
+    if section != 'DEFAULT' and not config.has_section(section):
         section = 'DEFAULT'
-    encodings = [
-        x.strip() for x in config.get(section, 'encodings').split(',')]
-
-    # Split real name (which is optional) and email address parts
-    recipient_list = []
-    for recipient_name, recipient_addr in _getaddresses([recipient]):
-        recipient_encoding = guess_encoding(recipient_name, encodings)
-        recipient_list.append(_formataddr((recipient_name, recipient_addr),
-                                          charset=recipient_encoding))
+    settings = config.get_cached(section, _message_settings)
+    encodings = settings.encodings
 
     subject_encoding = guess_encoding(subject, encodings)
-    body_encoding = guess_encoding(body, encodings)
 
-    # Create the message ('plain' stands for Content-Type: text/plain)
-    message = _MIMEText(body, content_type, body_encoding)
+    multipart = settings.multipart_html and content_type == 'html'
+    use_8bit = settings.use_8bit
+    if multipart:
+        # The text/html and text/plain parts are added once the
+        # headers are set.
+        message = MIMEMultipart('alternative')
+        # Multipart messages have always carried a second copy of this
+        # header (from the text/html message they used to be built from).
+        message['MIME-Version'] = '1.0'
+    else:
+        # Create the message ('plain' stands for Content-Type: text/plain)
+        body_encoding = guess_encoding(body, encodings)
+        # With use-8bit the body is only set (and encoded) once, below.
+        message = _MIMEText(
+            '' if use_8bit else body, content_type, body_encoding)
     message['From'] = sender
-    message['To'] = ', '.join(recipient_list)
+    message['To'] = _encode_addresses(recipient, encodings)
     message['Subject'] = _Header(subject, subject_encoding)
-    if config.getboolean(section, 'use-8bit'):
+    if use_8bit and not multipart:
         del message['Content-Transfer-Encoding']
-        charset = _Charset(body_encoding)
-        charset.body_encoding = _email_encoders.encode_7or8bit
-        message.set_payload(body, charset=charset)
+        message.set_payload(body, charset=_8bit_charset(body_encoding))
+    bonus_headers = settings.bonus_headers
+    headers = []
     if extra_headers:
         for key,value in extra_headers.items():
-            encoding = guess_encoding(value, ['US-ASCII'] + encodings)
-            message[key] = _Header(value, encoding)
-    if config.getboolean(section, 'multipart-html'):
-        message = message_add_plain_multipart(
-                guid=str(message.get('x-rss-url', '')),
-                message=message,
-                html=body)
+            header = bonus_headers.get(key)
+            if header is None:
+                header = _header(value, settings.header_encodings)
+            headers.append((key, header))
+    for key,header in bonus_headers.items():
+        if not extra_headers or key not in extra_headers:
+            headers.append((key, header))
+    for key,header in headers:
+        if multipart and key.lower().startswith('content-'):
+            continue
+        message[key] = header
+    if multipart:
+        message.set_payload(_html_and_plain_parts(
+            guid=str(message.get('x-rss-url', '')), html=body,
+            options=config.html2text_options(section=section)))
     return message
 
-def smtp_send(recipient, message, config=None, section='DEFAULT'):
-    if config is None:
-        config = _config.CONFIG
-    server = config.get(section, 'smtp-server')
-    # Adding back in support for 'server:port'
-    pos = server.find(':')
-    if 0 <= pos:
-        # Strip port out of server name
-        port = int(server[pos+1:])
-        server = server[:pos]
-    else:
-        port = config.getint(section, 'smtp-port')
+_SSL_CONTEXT = None
+_SSL_CONTEXT_LOCK = _threading.Lock()
+
+def _ssl_context():
+    """Return the shared SSL context, so CA certificates are loaded once
+
+    send-threads workers may connect at the same time, and they must
+    all get the same context for their TLS sessions to be resumable by
+    one another.
+    """
+    global _SSL_CONTEXT
+    with _SSL_CONTEXT_LOCK:
+        if _SSL_CONTEXT is None:
+            _SSL_CONTEXT = _ssl.create_default_context()
+        return _SSL_CONTEXT
+
+# Last TLS session by (context, host, port), to resume it on reconnection
+_TLS_SESSIONS = {}
 
-    _LOG.debug('sending message to {} via {}'.format(recipient, server))
-    ssl = config.getboolean(section, 'smtp-ssl')
-    smtp_auth = config.getboolean(section, 'smtp-auth')
+class _SMTP_SSL (_smtplib.SMTP_SSL):
+    "SMTP_SSL resuming the previous TLS session with the same server"
+    _session_key = None
+
+    def _get_socket(self, host, port, timeout):
+        sock = _smtplib.SMTP._get_socket(self, host, port, timeout)
+        self._session_key = (self.context, host, port)
+        return self.context.wrap_socket(
+            sock, server_hostname=self._host,
+            session=_TLS_SESSIONS.get(self._session_key))
+
+    def remember_session(self):
+        "Keep our TLS session for the next connection to this server"
+        if self._session_key is not None and self.sock is not None:
+            _TLS_SESSIONS[self._session_key] = self.sock.session
+
+def _smtp_connect(settings):
+    server = settings.server
+    ssl = settings.ssl
+    smtp_auth = settings.auth
     try:
         if ssl or smtp_auth:
-            context = _ssl.create_default_context()
+            context = _ssl_context()
         if ssl:
-            smtp = _smtplib.SMTP_SSL(host=server, port=port, context=context)
+            smtp = _SMTP_SSL(
+                host=server, port=settings.port, context=context)
         else:
-            smtp = _smtplib.SMTP(host=server, port=port)
+            smtp = _smtplib.SMTP(host=server, port=settings.port)
     except KeyboardInterrupt:
         raise
     except Exception as e:
         raise _error.SMTPConnectionError(server=server) from e
     if smtp_auth:
-        username = config.get(section, 'smtp-username')
-        password = config.get(section, 'smtp-password')
+        username = settings.username
         try:
             if not ssl:
                 smtp.starttls(context=context)
-            smtp.login(username, password)
+            smtp.login(username, settings.password)
         except KeyboardInterrupt:
             raise
         except Exception as e:
+            smtp.close()
             raise _error.SMTPAuthenticationError(
                 server=server, username=username)
-    smtp.send_message(message, config.get(section, 'from'), recipient.split(','))
-    smtp.quit()
+    if ssl:
+        smtp.remember_session()
+    return smtp
 
-def lmtp_send(recipient, message, config=None, section='DEFAULT'):
+def _smtp_deliver(protocol, settings, opener, recipient, message):
+    "Send `message` with SMTP or LMTP through `_deliver`"
+    # Flattened here rather than by send_message(), so a reconnection
+    # does not flatten the message again.
+    message_bytes = _flatten(message, linesep='\r\n')
+    try:
+        _deliver(
+            # the envelope sender is per message, so feeds with
+            # different senders share the connection
+            key=(protocol, settings._replace(sender=None)),
+            opener=opener,
+            deliver=lambda smtp: smtp.sendmail(
+                settings.sender, _envelope_recipients(recipient),
+                message_bytes))
+    except _error.RSS2EmailError:
+        raise
+    except Exception as e:
+        raise _error.SMTPConnectionError(
+            server=settings.server,
+            message='could not send message to {} via {}'.format(
+                recipient, settings.server)) from e
+
+def smtp_send(recipient, message, config=None, section='DEFAULT'):
     if config is None:
         config = _config.CONFIG
-    server = config.get(section, 'lmtp-server')
-    port = config.getint(section, 'lmtp-port')
+    settings = config.get_cached(section, _smtp_settings)
+    _LOG.debug('sending message to %s via %s', recipient, settings.server)
+    _smtp_deliver(
+        protocol='smtp', settings=settings,
+        opener=lambda: _smtp_connect(settings),
+        recipient=recipient, message=message)
 
-    _LOG.debug('sending message to {} via {}'.format(recipient, server))
-    lmtp_auth = config.getboolean(section, 'lmtp-auth')
+def _lmtp_connect(settings):
+    server = settings.server
     try:
-        lmtp = _smtplib.LMTP(host=server, port=port)
+        lmtp = _smtplib.LMTP(host=server, port=settings.port)
     except KeyboardInterrupt:
         raise
     except Exception as e:
         raise _error.SMTPConnectionError(server=server) from e
-    if lmtp_auth:
-        username = config.get(section, 'lmtp-username')
-        password = config.get(section, 'lmtp-password')
+    if settings.auth:
+        username = settings.username
         try:
-            lmtp.login(username, password)
+            lmtp.login(username, settings.password)
         except KeyboardInterrupt:
             raise
         except Exception as e:
+            lmtp.close()
             raise _error.SMTPAuthenticationError(
                 server=server, username=username)
-    lmtp.send_message(message, config.get(section, 'from'), recipient.split(','))
-    lmtp.quit()
+    return lmtp
 
-def imap_send(message, config=None, section='DEFAULT'):
+def lmtp_send(recipient, message, config=None, section='DEFAULT'):
     if config is None:
         config = _config.CONFIG
-    server = config.get(section, 'imap-server')
-    port = config.getint(section, 'imap-port')
-    _LOG.debug('sending message to {}:{}'.format(server, port))
-    ssl = config.getboolean(section, 'imap-ssl')
+    settings = config.get_cached(section, _lmtp_settings)
+
+    _LOG.debug('sending message to %s via %s', recipient, settings.server)
+    _smtp_deliver(
+        protocol='lmtp', settings=settings,
+        opener=lambda: _lmtp_connect(settings),
+        recipient=recipient, message=message)
+
+def _imap_connect(settings):
+    server = settings.server
+    port = settings.port
+    ssl = settings.ssl
     if ssl:
         imap = _imaplib.IMAP4_SSL(server, port)
     else:
         imap = _imaplib.IMAP4(server, port)
-    try:
-        if config.getboolean(section, 'imap-auth'):
-            username = config.get(section, 'imap-username')
-            password = config.get(section, 'imap-password')
-            try:
-                if not ssl:
-                    imap.starttls()
-                imap.login(username, password)
-            except KeyboardInterrupt:
-                raise
-            except Exception as e:
-                raise _error.IMAPAuthenticationError(
-                    server=server, port=port, username=username)
-        mailbox = config.get(section, 'imap-mailbox')
+    if settings.auth:
+        username = settings.username
+        try:
+            if not ssl:
+                imap.starttls()
+            imap.login(username, settings.password)
+        except KeyboardInterrupt:
+            imap.logout()
+            raise
+        except Exception as e:
+            imap.logout()
+            raise _error.IMAPAuthenticationError(
+                server=server, port=port, username=username)
+    return imap
+
+def imap_send(message, config=None, section='DEFAULT'):
+    if config is None:
+        config = _config.CONFIG
+    settings = config.get_cached(section, _imap_settings)
+    _LOG.debug('sending message to %s:%s', settings.server, settings.port)
+    message_bytes = _flatten(message)
+
+    def append(imap):
         date = _imaplib.Time2Internaldate(_time.localtime())
-        message_bytes = _flatten(message)
-        imap.append(mailbox, None, date, message_bytes)
-    finally:
-        imap.logout()
+        imap.append(settings.mailbox, None, date, message_bytes)
+
+    _deliver(
+        key=('imap', settings),
+        opener=lambda: _imap_connect(settings),
+        deliver=append,
+        disconnected=lambda error: isinstance(error, _imaplib.IMAP4.abort))
 
 def maildir_send(message, config=None, section='DEFAULT'):
     if config is None:
         config = _config.CONFIG
-    path = config.get(section, 'maildir-path')
-    mailbox = config.get(section, 'maildir-mailbox')
-    maildir = _mailbox.Maildir(_os.path.join(path, mailbox))
+    maildir = _mailbox.Maildir(config.get_cached(section, _maildir_path))
     maildir.add(message)
 
 def _decode_header(header):
@@ -313,9 +917,11 @@ def _decode_header(header):
             chunks.append(str(chunk, charset))
     return ''.join(chunks)
 
-def _flatten(message):
+def _flatten(message, linesep='\n'):
     r"""Flatten an email.message.Message to bytes
 
+    Lines end with `linesep`; SMTP and LMTP need ``'\r\n'``.
+
     >>> import rss2email.config
     >>> config = rss2email.config.Config()
     >>> config.read_dict(rss2email.config.CONFIG)
@@ -381,57 +987,156 @@ def _flatten(message):
     b''
     b"Y\x00o\x00u\x00'\x00r\x00e\x00 \x00g\x00r\x00e\x00a\x00t\x00,\x00 \x00\x96\x03\xb5\x03\xcd\x03\xc2\x03!\x00"
     b'\x00'
+
+    Long headers are folded and body lines starting with "From " are
+    escaped, even for plain 7-bit messages:
+
+    >>> config.set('DEFAULT', 'use-8bit', str(False))
+    >>> config.set('DEFAULT', 'encodings', 'US-ASCII, UTF-8')
+    >>> message = get_message(
+    ...     sender='John <jdoe@a.com>', recipient='z@olympus.org',
+    ...     subject=' '.join(['Homage'] * 15),
+    ...     body="From Olympus\n",
+    ...     content_type='plain',
+    ...     config=config)
+    >>> for line in _flatten(message).split(b'\n'):
+    ...     print(line)  # doctest: +REPORT_UDIFF
+    b'MIME-Version: 1.0'
+    b'Content-Type: text/plain; charset="us-ascii"'
+    b'Content-Transfer-Encoding: 7bit'
+    b'From: John <jdoe@a.com>'
+    b'To: z@olympus.org'
+    b'Subject: Homage Homage Homage Homage Homage Homage Homage Homage Homage Homage Homage'
+    b' Homage Homage Homage Homage'
+    b''
+    b'>From Olympus'
+    b''
     """
     bytesio = _io.BytesIO()
     # TODO: use policies argument instead of policy set in `message`
     # see https://docs.python.org/3.6/library/email.generator.html?highlight=bytesgenerator#email.generator.BytesGenerator
     generator = _BytesGenerator(bytesio)
     try:
-        generator.flatten(message)
+        generator.flatten(message, linesep=linesep)
     except UnicodeEncodeError as e:
-        # HACK: work around deficiencies in BytesGenerator
-        _LOG.warning(e)
-        b = message.as_string().encode(str(message.get_charset()))
-        m = _email.message_from_bytes(b)
-        if not m:
+        flattened = _flatten_fallback(message, e, linesep)
+        if flattened is None:
             raise
-        h = {k:_decode_header(v) for k,v in m.items()}
-        head = {k:_decode_header(v) for k,v in message.items()}
-        body = str(m.get_payload(decode=True), str(m.get_charsets()[0]))
-        if (h == head and body == message.get_payload()):
-            return b
-        raise
-    else:
-        return bytesio.getvalue()
+        return flattened
+    return bytesio.getvalue()
+
+def _flatten_fallback(message, error, linesep='\n'):
+    """Flatten `message` through `str` after BytesGenerator failed
+
+    Returns `None` unless the result parses back to the same headers
+    and body.  Messages without a charset (multipart ones) are not
+    even tried:
+
+    >>> message = MIMEMultipart()
+    >>> message.preamble = 'Ζεύς'
+    >>> _flatten(message)
+    Traceback (most recent call last):
+      ...
+    UnicodeEncodeError: 'ascii' codec can't encode characters in position 0-3: ordinal not in range(128)
+    """
+    # HACK: work around deficiencies in BytesGenerator
+    _LOG.warning(error)
+    charset = message.get_charset()
+    if charset is None:
+        return None
+    string = message.as_string()
+    b = string.encode(str(charset))
+    m = _email.message_from_bytes(b)
+    if not m:
+        return None
+    h = {k:_decode_header(v) for k,v in m.items()}
+    head = {k:_decode_header(v) for k,v in message.items()}
+    body = str(m.get_payload(decode=True), str(m.get_charsets()[0]))
+    if (h == head and body == message.get_payload()):
+        if linesep != '\n':
+            # as_string() only ever ends lines with '\n'
+            b = string.replace('\n', linesep).encode(str(charset))
+        return b
+    return None
 
 def sendmail_send(recipient, message, config=None, section='DEFAULT'):
     if config is None:
         config = _config.CONFIG
+    settings = config.get_cached(section, _sendmail_settings)
+    if (settings.batch and _SESSION is not None and
+            _sendmail_batch_send(recipient, message, settings)):
+        return
     message_bytes = _flatten(message)
-    sendmail = [config.get(section, 'sendmail')]
-    sendmail_config = config.get(section, 'sendmail_config')
-    if sendmail_config:
-        sendmail.extend(['-C', sendmail_config])
-    sender_name,sender_addr = _parseaddr(config.get(section, 'from'))
-    _LOG.debug(
-        'sending message to {} via {}'.format(recipient, sendmail))
+    sendmail = list(settings.command)
+    _LOG.debug('sending message to %s via %s', recipient, sendmail)
     try:
         p = _subprocess.Popen(
-            sendmail + ['-F', sender_name, '-f', sender_addr, recipient],
+            sendmail + [
+                '-F', settings.sender_name, '-f', settings.sender_addr,
+                recipient],
             stdin=_subprocess.PIPE, stdout=_subprocess.PIPE,
             stderr=_subprocess.STDOUT)
+        # communicate() writes straight from the bytes object, one
+        # memoryview slice at a time, so there is no copy to avoid here.
         stdout, _ = p.communicate(message_bytes)
         status = p.wait()
-        _LOG.debug(stdout.decode())
+        if stdout:
+            # sendmail did its job even if its output is not UTF-8
+            output = stdout.decode(errors='replace')
+            _LOG.debug(output)
+            if status and _LOG.level > logging.DEBUG:
+                _LOG.error(output)
         if status:
-            if _LOG.level > logging.DEBUG:
-                _LOG.error(stdout.decode())
             raise _error.SendmailError(status=status)
     except Exception as e:
         raise _error.SendmailError() from e
 
+# sendmail commands that could not be started in -bs mode
+_SENDMAIL_WITHOUT_BS = set()
+
+def _open_sendmail_bs(settings):
+    try:
+        return _SendmailSMTP(
+            settings.command, settings.sender_name, settings.sender_addr)
+    except _smtplib.SMTPException:
+        _SENDMAIL_WITHOUT_BS.add(settings.command)
+        raise
+
+def _sendmail_batch_send(recipient, message, settings):
+    """Send through the session's ``sendmail -bs`` process
+
+    Return False, without sending anything, if sendmail does not
+    support -bs, so the caller can fall back to one sendmail process
+    per message.
+    """
+    if settings.command in _SENDMAIL_WITHOUT_BS:
+        return False
+    _LOG.debug(
+        'sending message to %s via %s -bs', recipient, list(settings.command))
+    message_bytes = _flatten(message, linesep='\r\n')
+    try:
+        _deliver(
+            # -F/-f apply to the whole process, so feeds with different
+            # senders do not share it
+            key=('sendmail', settings.command,
+                 settings.sender_name, settings.sender_addr),
+            opener=lambda: _open_sendmail_bs(settings),
+            deliver=lambda sendmail: sendmail.sendmail(
+                settings.sender_addr, _envelope_recipients(recipient),
+                message_bytes))
+    except Exception as e:
+        if settings.command in _SENDMAIL_WITHOUT_BS:
+            _LOG.warning(
+                '%s does not support -bs, starting one sendmail per '
+                'message instead (%s)', list(settings.command), e)
+            return False
+        raise _error.SendmailError() from e
+    return True
+
 def send(recipient, message, config=None, section='DEFAULT'):
-    protocol = config.get(section, 'email-protocol')
+    if config is None:
+        config = _config.CONFIG
+    protocol = config.get_cached(section, _message_settings).protocol
     if protocol == 'smtp':
         smtp_send(
             recipient=recipient, message=message,
@@ -33,7 +33,6 @@ from . import __version__, __url__, __email__
 import pprint as _pprint
 
 import feedparser as _feedparser
-import html2text as _html2text
 
 
 class RSS2EmailError (Exception):
@@ -194,6 +193,8 @@ class ProcessingError (FeedError):
                 'error: {} {}'.format(
                     self.parsed.get('bozo_exception', "can't process"),
                     self.feed.url))
+            import html2text as _html2text
+
             _LOG.warning(_pprint.pformat(self.parsed))
             _LOG.warning('rss2email {}'.format(__version__))
             _LOG.warning('feedparser {}'.format(_feedparser.__version__))
@@ -52,7 +52,6 @@
 """
 
 import calendar as _calendar
-import collections as _collections
 import platform
 from email.message import Message
 from email.mime.message import MIMEMessage as _MIMEMessage
@@ -62,9 +61,10 @@ from email.utils import formatdate as _formatdate
 from email.utils import parseaddr as _parseaddr
 import hashlib as _hashlib
 import html.parser as _html_parser
+import itertools as _itertools
+import os as _os
 import re as _re
 import socket as _socket
-import time as _time
 import urllib.request as _urllib_request
 import uuid as _uuid
 import xml.sax as _sax
@@ -73,7 +73,6 @@ from functools import lru_cache
 from typing import Optional, Dict, Any, Tuple
 
 import feedparser as _feedparser
-import html2text as _html2text
 import html as _html
 
 from . import __url__
@@ -98,6 +97,71 @@ _SOCKET_ERRORS = tuple(_SOCKET_ERRORS)
 _feedparser.PREFERRED_XML_PARSERS = []
 
 
+# Message-IDs only need to be unique, not unpredictable: a random
+# prefix drawn once per process and a counter avoid reading
+# os.urandom() for every message.  The prefix is redrawn in forked
+# children, which would otherwise repeat the parent's IDs.
+_MESSAGE_ID_PREFIX = (None, None)  # (pid, prefix)
+_MESSAGE_ID_COUNTER = _itertools.count()
+
+def _message_id():
+    """Return a new Message-ID
+
+    >>> a, b = _message_id(), _message_id()
+    >>> a != b
+    True
+    >>> a.split('@')[1] == '{}>'.format(platform.node())
+    True
+    """
+    global _MESSAGE_ID_PREFIX
+    pid, prefix = _MESSAGE_ID_PREFIX
+    if pid != _os.getpid():
+        pid = _os.getpid()
+        prefix = '{}.{}'.format(_uuid.uuid4().hex, pid)
+        _MESSAGE_ID_PREFIX = (pid, prefix)
+    return '<{}.{}@{}>'.format(
+        prefix, next(_MESSAGE_ID_COUNTER), platform.node())
+
+
+@lru_cache(maxsize=16)
+def _html_mail_head(css=None):
+    """Return the entry-independent start of HTML mail bodies
+
+    >>> print(_html_mail_head(css='a > b {}'))
+    <!DOCTYPE html>
+    <html>
+      <head>
+        <style type="text/css">
+    a &gt; b {}
+        </style>
+    </head>
+    <body dir="auto">
+    <div class="entry" id="entry">
+    """
+    lines = [
+        '<!DOCTYPE html>',
+        '<html>',
+        '  <head>',
+        ]
+    if css:
+        lines.extend([
+                '    <style type="text/css">',
+                _saxutils.escape(css),
+                '    </style>',
+                ])
+    # For backward compatibility, specify "body" and "entry"
+    # as both class and id.  Unlike the other elements
+    # (header, footer) they were used as ids, not classes,
+    # which was inconsistent as well as problemmatic
+    # in the config file (# is a comment character).
+    lines.extend([
+            '</head>',
+            '<body dir="auto">',
+            '<div class="entry" id="entry">',
+            ])
+    return '\n'.join(lines)
+
+
 class Feed (object):
     """Utility class for feed manipulation and storage.
 
@@ -164,6 +228,8 @@ class Feed (object):
 
     """
     _name_regexp = _re.compile(r'^[\w\d.-]+$')
+    # exactly one '@', with something on both sides
+    _email_regexp = _re.compile(r'[^@]+@[^@]+')
 
     # saved/loaded from feed.dat using __getstate__/__setstate__.
     _dynamic_attributes = [
@@ -199,9 +265,12 @@ class Feed (object):
     # .config option -> attribute name
     _configured_attribute_inverse_translations = dict(
         (v,k) for k,v in _configured_attribute_translations.items())
+    # what load_from_config() expects to find in a section
+    _expected_configured_options = sorted(
+        _configured_attribute_translations.values())
 
-    # hints for value conversion
-    _boolean_attributes = [
+    # hints for value conversion (sets, they are only used for lookups)
+    _boolean_attributes = frozenset([
         'digest',
         'force_from',
         'use_publisher_email',
@@ -216,22 +285,28 @@ class Feed (object):
         'links_after_each_paragraph',
         'use_smtp',
         'smtp_ssl',
-        ]
+        ])
 
-    _integer_attributes = [
+    _integer_attributes = frozenset([
         'feed_timeout',
         'body_width',
-        ]
+        'send_threads',
+        'fetch_threads',
+        'max_entries',
+        ])
 
-    _list_attributes = [
+    _list_attributes = frozenset([
         'date_header_order',
         'encodings',
-        ]
+        ])
 
-    _function_attributes = [
+    _function_attributes = frozenset([
         'post_process',
         'digest_post_process',
-        ]
+        ])
+
+    # (html, baseurl, text) of the last _html2text() conversion
+    _last_html2text = None
 
     @property
     def user_agent(self):
@@ -239,6 +314,16 @@ class Feed (object):
             replace('__VERSION__', __version__).\
             replace('__URL__', __url__)
 
+    @property
+    def escaped_name(self):
+        "``name`` escaped for XML (e.g. OPML export)"
+        return _saxutils.escape(self.name or '')
+
+    @property
+    def escaped_url(self):
+        "``url`` escaped for XML (e.g. OPML export)"
+        return _saxutils.escape(self.url or '')
+
     def __init__(self, name=None, url=None, to=None, config=None):
         self._set_name(name=name)
         self.reset()
@@ -277,7 +362,7 @@ class Feed (object):
 
     def save_to_config(self):
         "Save configured attributes"
-        data = _collections.OrderedDict()
+        data = {}
         default = self.config['DEFAULT']
         for attr in self._configured_attributes:
             key = self._configured_attribute_translations[attr]
@@ -296,11 +381,11 @@ class Feed (object):
             config = _config.CONFIG
         self.config = config
         if self.section in self.config:
-            data = self.config[self.section]
+            section = self.section
         else:
-            data = self.config['DEFAULT']
-        keys = sorted(data.keys())
-        expected = sorted(self._configured_attribute_translations.values())
+            section = 'DEFAULT'
+        keys = sorted(self.config[section].keys())
+        expected = self._expected_configured_options
         if keys != expected:
             for key in expected:
                 if (key not in keys and
@@ -313,12 +398,12 @@ class Feed (object):
                     raise _error.InvalidFeedConfig(
                         setting=key, feed=self,
                         message='extra configuration key: {}'.format(key))
-        data = dict(
-            (self._configured_attribute_inverse_translations[k],
-             self._get_configured_attribute_value(
-                  attribute=self._configured_attribute_inverse_translations[k],
-                  key=k, data=data))
-            for k in data.keys())
+        translations = self._configured_attribute_inverse_translations
+        data = {}
+        for key in keys:
+            attribute = translations[key]
+            data[attribute] = self._get_configured_attribute_value(
+                attribute=attribute, key=key, section=section)
         for attr in self._non_default_configured_attributes:
             if attr not in data:
                 data[attr] = None
@@ -333,18 +418,21 @@ class Feed (object):
             return _util.import_name(value)
         return str(value)
 
-    def _get_configured_attribute_value(self, attribute, key, data):
+    def _get_configured_attribute_value(self, attribute, key, section):
+        # The *_of() getters parse each option of a section only once,
+        # instead of once per feed using the default value.
         if attribute in self._boolean_attributes:
-            return data.getboolean(key)
+            return self.config.bool_of(section, key)
         elif attribute in self._integer_attributes:
-            return data.getint(key)
+            return self.config.int_of(section, key)
         elif attribute in self._list_attributes:
-            return [x.strip() for x in data[key].split(',')]
-        elif attribute in self._function_attributes:
-            if data[key]:
-                return _util.import_function(data[key])
+            return list(self.config.tuple_of(section, key))
+        value = self.config.str_of(section, key)
+        if attribute in self._function_attributes:
+            if value:
+                return _util.import_function(value)
             return None
-        return data[key]
+        return value
 
     def reset(self):
         """Reset dynamic data
@@ -369,29 +457,32 @@ class Feed (object):
         >>> parsed.status
         200
         """
-        _LOG.info('fetch {}'.format(self))
+        _LOG.info('fetch %s', self)
         if not self.url:
             raise _error.InvalidFeedConfig(setting='url', feed=self)
-        if self.section in self.config:
-            config = self.config[self.section]
-        else:
-            config = self.config['DEFAULT']
-        proxy = config['proxy']
-        timeout = config.getint('feed-timeout')
+        proxy = self.proxy
         kwargs = {}
         if proxy:
             kwargs['handlers'] = [
                 _urllib_request.ProxyHandler({ 'http': proxy, 'https': proxy })
             ]
-        f = _util.TimeLimitedFunction('feed {}'.format(self.name), timeout, _feedparser.parse)
+        f = _util.TimeLimitedFunction('feed {}'.format(self.name), self.feed_timeout, _feedparser.parse)
         return f(self.url, self.etag, modified=self.modified, agent=self.user_agent, **kwargs)
 
     def _process(self, parsed):
-        _LOG.info('process {}'.format(self))
+        _LOG.info('process %s', self)
         self._check_for_errors(parsed)
-        for entry in reversed(parsed.entries):
-            _LOG.debug('processing {}'.format(entry.get('id', 'no-id')))
-            processed = self._process_entry(parsed=parsed, entry=entry)
+        entries = parsed.entries
+        if self.max_entries > 0:
+            entries = entries[:self.max_entries]
+        # Some feeds (aggregators especially) list an entry more than
+        # once.  Digests and parallel sends only mark entries as seen
+        # afterwards, so _process_entry() skips repeats itself.
+        guids = set()
+        for entry in reversed(entries):
+            _LOG.debug('processing %s', entry.get('id', 'no-id'))
+            processed = self._process_entry(
+                parsed=parsed, entry=entry, guids=guids)
             if processed:
                 guid, _, sender, message = processed
                 if self.post_process:
@@ -405,16 +496,12 @@ class Feed (object):
     def _check_for_errors(self, parsed):
         warned = False
         status = getattr(parsed, 'status', 200)
-        _LOG.debug('HTTP status {}'.format(status))
+        _LOG.debug('HTTP status %s', status)
         if status in [301, 308]:
             _LOG.info('redirect {} from {} to {}'.format(
                     self.name, self.url, parsed['url']))
             self.url = parsed['url']
             # TODO: `url` is not saved -- add config option to call feeds.save_config() in run command
-        elif status == 304:
-            _LOG.info('skipping {}: feed was not modified since last update'.format(
-                    self.name, self.url))
-            return
         elif status == 410:
             _LOG.warning('deactivate {} because {} is gone'.format(
                     self.name, self.url))
@@ -426,7 +513,7 @@ class Feed (object):
 
         http_headers = parsed.get('headers', {})
         if http_headers:
-            _LOG.debug('HTTP headers: {}'.format(http_headers))
+            _LOG.debug('HTTP headers: %s', http_headers)
             http_headers = dict((k.lower(), v) for k, v in http_headers.items())
         if not http_headers:
             _LOG.warning('could not get HTTP headers: {}'.format(self))
@@ -441,45 +528,48 @@ class Feed (object):
 
         version = parsed.get('version', None)
         if version:
-            _LOG.debug('feed version {}'.format(version))
+            _LOG.debug('feed version %s', version)
         else:
-            _LOG.debug('unrecognized version: {}'.format(self))
+            _LOG.debug('unrecognized version: %s', self)
             warned = True
 
         exc = parsed.get('bozo_exception', None)
-        if isinstance(exc, _socket.timeout):
-            _LOG.error('timed out: {}'.format(self))
-            warned = True
-        elif isinstance(exc, OSError):
-            _LOG.error('{}: {}'.format(exc, self))
-            warned = True
-        elif isinstance(exc, _SOCKET_ERRORS):
-            _LOG.error('{}: {}'.format(exc, self))
-            warned = True
-        elif isinstance(exc, _feedparser.http.zlib.error):
-            _LOG.error('broken compression: {}'.format(self))
-            warned = True
-        elif isinstance(exc, (IOError, AttributeError)):
-            _LOG.error('{}: {}'.format(exc, self))
-            warned = True
-        elif isinstance(exc, KeyboardInterrupt):
-            raise exc
-        elif isinstance(exc, _sax.SAXParseException):
-            _LOG.error('sax parsing error: {}: {}'.format(exc, self))
-            warned = True
-        elif (parsed.bozo and
-              isinstance(exc, _feedparser.CharacterEncodingOverride)):
-            _LOG.warning(
-                'incorrectly declared encoding: {}: {}'.format(exc, self))
-            warned = True
-        elif (parsed.bozo and isinstance(exc, _feedparser.NonXMLContentType)):
-            _LOG.warning('non XML Content-Type: {}: {}'.format(exc, self))
-            warned = True
-        elif parsed.bozo or exc:
-            if exc is None:
-                exc = "can't process"
-            _LOG.error('processing error: {}: {}'.format(exc, self))
-            warned = True
+        bozo = parsed.get('bozo', False)
+        # most feeds parse cleanly, skip the classification then
+        if exc is not None or bozo:
+            if isinstance(exc, _socket.timeout):
+                _LOG.error('timed out: {}'.format(self))
+                warned = True
+            elif isinstance(exc, OSError):
+                _LOG.error('{}: {}'.format(exc, self))
+                warned = True
+            elif isinstance(exc, _SOCKET_ERRORS):
+                _LOG.error('{}: {}'.format(exc, self))
+                warned = True
+            elif isinstance(exc, _feedparser.http.zlib.error):
+                _LOG.error('broken compression: {}'.format(self))
+                warned = True
+            elif isinstance(exc, (IOError, AttributeError)):
+                _LOG.error('{}: {}'.format(exc, self))
+                warned = True
+            elif isinstance(exc, KeyboardInterrupt):
+                raise exc
+            elif isinstance(exc, _sax.SAXParseException):
+                _LOG.error('sax parsing error: {}: {}'.format(exc, self))
+                warned = True
+            elif (bozo and
+                  isinstance(exc, _feedparser.CharacterEncodingOverride)):
+                _LOG.warning(
+                    'incorrectly declared encoding: {}: {}'.format(exc, self))
+                warned = True
+            elif (bozo and isinstance(exc, _feedparser.NonXMLContentType)):
+                _LOG.warning('non XML Content-Type: {}: {}'.format(exc, self))
+                warned = True
+            elif bozo or exc:
+                if exc is None:
+                    exc = "can't process"
+                _LOG.error('processing error: {}: {}'.format(exc, self))
+                warned = True
 
         if (not warned and
             status in [200, 302] and
@@ -488,29 +578,56 @@ class Feed (object):
             raise _error.ProcessingError(parsed=parsed, feed=self)
 
     def _html2text(self, html, baseurl='', default=None):
-        self.config.setup_html2text(section=self.section)
+        import html2text as _html2text
+
+        # Entries without a title have their content converted twice,
+        # once for the subject and once for the body.
+        last = self._last_html2text
+        if last is not None and last[0] == html and last[1] == baseurl:
+            return last[2]
+        # HTML2Text instances keep per-document state, so each
+        # conversion gets a fresh one, configured directly from the
+        # (cached) options rather than through the html2text globals.
+        converter = _html2text.HTML2Text(baseurl=baseurl)
+        for name, value in self.config.html2text_options(
+                section=self.section).items():
+            setattr(converter, name, value)
         try:
-            return _html2text.html2text(html=html, baseurl=baseurl)
+            text = converter.handle(html)
         except _html_parser.HTMLParseError as e:
             if default is not None:
                 return default
             raise
+        self._last_html2text = (html, baseurl, text)
+        return text
 
-    def _process_entry(self, parsed, entry) -> Optional[Tuple[str, Dict[str, Any], str, Message]]:
+    def _process_entry(self, parsed, entry, guids=None) -> Optional[Tuple[str, Dict[str, Any], str, Message]]:
+        """Build the message for `entry`, if it should be sent
+
+        `guids` collects the entries processed so far in this run;
+        repeats of them are skipped before any message is built.
+        """
         guid = self._get_uid_for_entry(entry)
-        new_hash = self._get_entry_hash(entry)
+        if guids is not None and guid in guids:
+            _LOG.debug('skipping duplicate %s', guid)
+            return None
 
+        # The hash covers the whole entry content, so it is only
+        # computed for entries that may be sent (already seen entries
+        # are skipped before hashing unless reply-changes is set).
         old_state = self.seen.get(guid)
         if old_state is None:
-            _LOG.debug('not seen {}'.format(guid))
+            _LOG.debug('not seen %s', guid)
             new_state = {} # type: Dict[str, Any]
+            new_hash = self._get_entry_hash(entry)
         else:
-            _LOG.debug('already seen {}'.format(guid))
+            _LOG.debug('already seen %s', guid)
             if 'old' in old_state:
                 del old_state['old']
             if self.reply_changes:
+                new_hash = self._get_entry_hash(entry)
                 if new_hash != old_state.get('hash'):
-                    _LOG.debug('hash changed for {}'.format(guid))
+                    _LOG.debug('hash changed for %s', guid)
                     new_state = old_state.copy()
                 else:
                     return None
@@ -518,13 +635,17 @@ class Feed (object):
                 return None
 
         new_state['hash'] = new_hash
+        if guids is not None:
+            guids.add(guid)
 
         sender = self._get_entry_email(parsed=parsed, entry=entry)
         subject = self._get_entry_subject(entry=entry)
+        link = self._get_entry_link(entry)
 
-        message_id = '<{0}@{1}>'.format(_uuid.uuid4(), platform.node())
+        message_id = _message_id()
         in_reply_to = old_state.get('message_id') if old_state is not None else None
-        extra_headers = _collections.OrderedDict((
+        extra_headers = dict(
+            (key, value) for key, value in (
                 ('Date', self._get_entry_date(entry)),
                 ('Message-ID', message_id),
                 ('In-Reply-To', in_reply_to),
@@ -533,27 +654,16 @@ class Feed (object):
                 ('List-Post', 'NO (posting not allowed on this list)'),
                 ('X-RSS-Feed', self.url),
                 ('X-RSS-ID', guid),
-                ('X-RSS-URL', self._get_entry_link(entry)),
+                ('X-RSS-URL', link),
                 ('X-RSS-TAGS', self._get_entry_tags(entry)),
-                ))
-        # remove empty tags, etc.
-        keys = {k for k, v in extra_headers.items() if v is None}
-        for key in keys:
-            extra_headers.pop(key)
-        if self.bonus_header:
-            for header in self.bonus_header.splitlines():
-                if ':' in header:
-                    key,value = header.split(':', 1)
-                    extra_headers[key.strip()] = value.strip()
-                else:
-                    _LOG.warning(
-                        'malformed bonus-header: {}'.format(
-                            self.bonus_header))
+                )
+            if value is not None)  # skip empty tags, etc.
+        # bonus-header is added (and encoded once) by get_message()
 
         content = self._get_entry_content(entry)
         try:
             content = self._process_entry_content(
-                entry=entry, content=content, subject=subject)
+                entry=entry, content=content, subject=subject, link=link)
         except _error.ProcessingError as e:
             e.parsed = parsed
             raise
@@ -620,14 +730,12 @@ class Feed (object):
         return title
 
     def _get_entry_date(self, entry):
-        datetime = _time.gmtime()
         if self.date_header:
             for datetype in self.date_header_order:
-                kind = datetype + '_parsed'
-                if entry.get(kind, None):
-                    datetime = entry[kind]
-                    break
-        return _formatdate(_calendar.timegm(datetime))
+                datetime = entry.get(datetype + '_parsed', None)
+                if datetime:
+                    return _formatdate(_calendar.timegm(datetime))
+        return _formatdate()  # now
 
     def _get_entry_name(self, parsed, entry):
         """Get the best name
@@ -708,9 +816,10 @@ class Feed (object):
         'default@example.com'
         >>> f._validate_email('invalid', 'default@example.com')
         'default@example.com'
+        >>> f._validate_email('in@val@id', 'default@example.com')
+        'default@example.com'
         """
-        parts = email.split('@')
-        if len(parts) != 2 or '' in parts:
+        if not self._email_regexp.fullmatch(email):
             if default is None:
                 return self.from_email
             return default
@@ -820,35 +929,17 @@ class Feed (object):
             return contents[0]
         return {'type': 'text/plain', 'value': ''}
 
-    def _process_entry_content(self, entry, content, subject):
+    def _process_entry_content(self, entry, content, subject, link):
         "Convert entry content to the requested format."
-        link = self._get_entry_link(entry)
         if self.html_mail:
+            escaped_link = _saxutils.escape(link) if link else ''
             lines = [
-                '<!DOCTYPE html>',
-                '<html>',
-                '  <head>',
+                _html_mail_head(self.css if self.use_css else None),
+                '<h1 class="header"><a href="{}">{}</a></h1>'.format(
+                    escaped_link,
+                    _saxutils.escape(subject)),
+                '<div class="body" id="body">',
                 ]
-            if self.use_css and self.css:
-                lines.extend([
-                        '    <style type="text/css">',
-                        _saxutils.escape(self.css),
-                        '    </style>',
-                        ])
-            # For backward compatibility, specify "body" and "entry"
-            # as both class and id.  Unlike the other elements
-            # (header, footer) they were used as ids, not classes,
-            # which was inconsistent as well as problemmatic
-            # in the config file (# is a comment character).
-            lines.extend([
-                    '</head>',
-                    '<body dir="auto">',
-                    '<div class="entry" id="entry">',
-                    '<h1 class="header"><a href="{}">{}</a></h1>'.format(
-                        _saxutils.escape(link) if link else '',
-                        _saxutils.escape(subject)),
-                    '<div class="body" id="body">',
-                    ])
             if content['type'] in ('text/html', 'application/xhtml+xml'):
                 lines.append(content['value'].strip())
             else:
@@ -857,20 +948,23 @@ class Feed (object):
             lines.append('<div class="footer">')
             if link:
                 lines.append(
-                    '<p>URL: <a href="{0}">{0}</a></p>'.format(
-                        _saxutils.escape(link)))
-            for enclosure in getattr(entry, 'enclosures', []):
-                if getattr(enclosure, 'url', None):
-                    lines.append(
-                        '<p>Enclosure: <a href="{0}">{0}</a></p>'.format(
-                            _saxutils.escape(enclosure.url)))
-                if getattr(enclosure, 'src', None):
+                    '<p>URL: <a href="{0}">{0}</a></p>'.format(escaped_link))
+            # feedparser builds `enclosures` from `links` on every
+            # access, and resolves `url` through its key aliases, so
+            # look each of them up once.
+            for enclosure in entry.get('enclosures', ()):
+                url = enclosure.get('url', None)
+                if url:
                     lines.append(
                         '<p>Enclosure: <a href="{0}">{0}</a></p>'.format(
-                            _saxutils.escape(enclosure.src)))
+                            _saxutils.escape(url)))
+                src = enclosure.get('src', None)
+                if src:
+                    src = _saxutils.escape(src)
                     lines.append(
-                        '<p><img src="{}" /></p>'.format(_saxutils.escape(enclosure.src)))
-            for elink in getattr(entry, 'links', []):
+                        '<p>Enclosure: <a href="{0}">{0}</a></p>'.format(src))
+                    lines.append('<p><img src="{}" /></p>'.format(src))
+            for elink in entry.get('links', ()):
                 if elink.get('rel', None) == 'via':
                     url = elink['href']
                     title = elink.get('title', url)
@@ -895,12 +989,14 @@ class Feed (object):
                 lines = [content['value']]
             lines.append('')
             lines.append('URL: {}'.format(link))
-            for enclosure in getattr(entry, 'enclosures', []):
-                if getattr(enclosure, 'url', None):
-                    lines.append('Enclosure: {}'.format(enclosure.url))
-                if getattr(enclosure, 'src', None):
-                    lines.append('Enclosure: {}'.format(enclosure.src))
-            for elink in getattr(entry, 'links', []):
+            for enclosure in entry.get('enclosures', ()):
+                url = enclosure.get('url', None)
+                if url:
+                    lines.append('Enclosure: {}'.format(url))
+                src = enclosure.get('src', None)
+                if src:
+                    lines.append('Enclosure: {}'.format(src))
+            for elink in entry.get('links', ()):
                 if elink.get('rel', None) == 'via':
                     url = elink['href']
                     title = elink.get('title', url)
@@ -910,16 +1006,30 @@ class Feed (object):
             return content
 
     def _send(self, sender, message):
-        _LOG.info('send message for {}'.format(self))
+        _LOG.info('send message for %s', self)
         section = self.section
         if section not in self.config:
             section = 'DEFAULT'
         _email.send(recipient=self.to, message=message,
                     config=self.config, section=section)
 
-    def run(self, send=True, clean=False):
+    def fetch(self, clean=False):
+        """Fetch and parse the feed for `run`.
+
+        With `clean`, the feed is fetched even if it has not changed
+        since the last fetch.
+        """
+        if clean:
+            self.etag = None
+            self.modified = None
+        return self._fetch()
+
+    def run(self, send=True, clean=False, parsed=None):
         """Fetch and process the feed, mailing entry emails.
 
+        `parsed` is the result of an earlier `fetch`, if the feed has
+        already been fetched.
+
         >>> feed = Feed(
         ...    name='test-feed',
         ...    url='http://feeds.feedburner.com/allthingsrss/hJBr')
@@ -932,14 +1042,25 @@ class Feed (object):
         """
         if not self.to:
             raise _error.NoToEmailAddress(feed=self)
-        if clean:
-            self.etag = None
-            self.modified = None
-        parsed = self._fetch()
+        if send and _email.session() is None:
+            # Run outside of `r2e run` (e.g. from a script): still
+            # reuse one connection for all of this feed's messages.
+            with _email.Session():
+                return self.run(send=send, clean=clean, parsed=parsed)
+        if parsed is None:
+            parsed = self.fetch(clean=clean)
+
+        if getattr(parsed, 'status', None) == 304:
+            # Nothing to process.  Keep the etag and modification time
+            # we sent, servers do not always repeat them in a 304.
+            _LOG.info(
+                'skipping %s: feed was not modified since last update',
+                self.name)
+            return
 
         if clean and len(parsed.entries) > 0:
-            for guid in self.seen:
-                self.seen[guid]['old'] = True
+            for state in self.seen.values():
+                state['old'] = True
 
         if self.digest:
             type = self.digest_type
@@ -948,7 +1069,7 @@ class Feed (object):
             digest = self._new_digest()
             seen = []
             for (guid, state, sender, message) in self._process(parsed):
-                _LOG.debug('new message: {}'.format(message['Subject']))
+                _LOG.debug('new message: %s', message['Subject'])
                 seen.append((guid, state))
                 self._append_to_digest(digest=digest, message=message)
             if seen:
@@ -956,14 +1077,16 @@ class Feed (object):
                     digest = self.digest_post_process(feed=self, parsed=parsed, seen=seen, message=digest)
                     if not digest:
                         return
-                _LOG.debug('new digest for {}'.format(self))
+                _LOG.debug('new digest for %s', self)
                 if send:
                     self._send_digest(digest=digest, sender=sender)
                 for (guid, state) in seen:
                     self.seen[guid] = state
+        elif send and self.send_threads > 1:
+            self._send_parallel(self._process(parsed))
         else:
             for (guid, state, sender, message) in self._process(parsed):
-                _LOG.debug('new message: {}'.format(message['Subject']))
+                _LOG.debug('new message: %s', message['Subject'])
                 if send:
                     self._send(sender=sender, message=message)
                     state['message_id'] = str(message["Message-ID"])
@@ -993,14 +1116,57 @@ class Feed (object):
             # author deletes an entry, an old entry could be resent.
 
             old = 3
-            for guid in reversed(list(self.seen)):
-                if 'old' in self.seen[guid]:
+            for guid, state in reversed(list(self.seen.items())):
+                if 'old' in state:
                     if old > 0:
-                        del self.seen[guid]['old']
+                        del state['old']
                     else:
                         del self.seen[guid]
                     old = old - 1
 
+    def _send_parallel(self, processed):
+        """Send processed entries from a pool of `send_threads` threads
+
+        An entry is only marked as seen once its message has been
+        sent.  If some messages fail, the others are still sent, and
+        the first error is raised once they are done.
+
+        The threads belong to the current email session, so the
+        following feeds reuse them and their connections.
+        """
+        session = _email.session()
+        if session is None:
+            with _email.Session():
+                return self._send_parallel(processed)
+        pool = session.executor(self.send_threads)
+        pending = []
+        error = None
+        submitted = False
+        try:
+            for (guid, state, sender, message) in processed:
+                _LOG.debug('new message: %s', message['Subject'])
+                future = pool.submit(
+                    self._send, sender=sender, message=message)
+                pending.append((guid, state, message, future))
+            submitted = True
+        finally:
+            for (guid, state, message, future) in pending:
+                try:
+                    future.result()
+                except Exception as e:
+                    # Keep the first error to raise below, unless
+                    # processing failed and its error is propagating.
+                    if submitted and error is None:
+                        error = e
+                    else:
+                        _LOG.error(
+                            'failed to send message for %s: %s', self, e)
+                    continue
+                state['message_id'] = str(message["Message-ID"])
+                self.seen[guid] = state
+        if error is not None:
+            raise error
+
     def _new_digest(self):
         if self.digest_type == 'multipart/digest':
             digest = _MIMEMultipart('digest')
@@ -1008,7 +1174,7 @@ class Feed (object):
             digest = _MIMEMultipart('mixed')
         digest['To'] = _formataddr(_parseaddr(self.to))  # Encodes with utf-8 as necessary
         digest['Subject'] = 'digest for {}'.format(self.name)
-        digest['Message-ID'] = '<{0}@{1}>'.format(_uuid.uuid4(), platform.node())
+        digest['Message-ID'] = _message_id()
         digest['User-Agent'] = self.user_agent
         digest['List-ID'] = '<{}.localhost>'.format(self.name)
         digest['List-Post'] = 'NO (posting not allowed on this list)'
@@ -39,6 +39,7 @@
 
 import codecs as _codecs
 import collections as _collections
+import io as _io
 import os as _os
 import json as _json
 import pickle as _pickle
@@ -144,8 +145,11 @@ class Feeds (list):
             config = _config.CONFIG
         self.config = config
         self.datafile = None
+        self._datafile_text = None
 
     def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return super(Feeds, self).__getitem__(key)
         for feed in self:
             if feed.name == key:
                 return feed
@@ -260,9 +264,11 @@ class Feeds (list):
         handlers = list(_LOG.handlers)
         feeds = []
         try:
-            data = _json.load(self.datafile)
+            self._datafile_text = self.datafile.read()
+            data = _json.loads(self._datafile_text)
         except ValueError as e:
             _LOG.info('could not load data file using JSON')
+            self._datafile_text = None
             data = self._load_pickled_data(self.datafile)
         version = data.get('version', None)
         if version != self.datafile_version:
@@ -330,26 +336,43 @@ class Feeds (list):
         _LOG.debug('save feed configuration to {}'.format(dst_config_file))
         for feed in self:
             feed.save_to_config()
+        stream = _io.StringIO()
+        self.config.write(stream)
+        text = stream.getvalue()
+        try:
+            with open(dst_config_file, 'r') as f:
+                unchanged = f.read() == text
+        except (OSError, ValueError):
+            unchanged = False
+        if unchanged:
+            _LOG.debug('feed configuration unchanged, skipping write')
+            return
         dirname = _os.path.dirname(dst_config_file)
         if dirname and not _os.path.isdir(dirname):
             _os.makedirs(dirname, mode=0o700, exist_ok=True)
         tmpfile = dst_config_file + '.tmp'
         with open(tmpfile, 'w') as f:
-            self.config.write(f)
+            f.write(text)
             f.flush()
             _os.fsync(f.fileno())
         _os.replace(tmpfile, dst_config_file)
 
     def save_feeds(self):
         _LOG.debug('save feed data to {}'.format(self.datafile_path))
+        text = self._dump_feed_states(feeds=self)
+        if text == self._datafile_text:
+            # Nothing changed since the data file was read.
+            self.close()  # release the lock
+            return
         dirname = _os.path.dirname(self.datafile_path)
         if dirname and not _os.path.isdir(dirname):
             _os.makedirs(dirname, mode=0o700, exist_ok=True)
         tmpfile = self.datafile_path + '.tmp'
         with _codecs.open(tmpfile, 'w', self.datafile_encoding) as f:
-            self._save_feed_states(feeds=self, stream=f)
+            f.write(text)
             f.flush()
             _os.fsync(f.fileno())
+        self._datafile_text = text
         if UNIX:
             # Replace the file, then release the lock by closing the old one.
             _os.replace(tmpfile, self.datafile_path)
@@ -359,16 +382,17 @@ class Feeds (list):
             self.close()
             _os.replace(tmpfile, self.datafile_path)
 
-    def _save_feed_states(self, feeds, stream):
-        _json.dump(
+    def _dump_feed_states(self, feeds):
+        return _json.dumps(
             {'version': self.datafile_version,
              'feeds': list(feed.get_state() for feed in feeds),
              },
-            stream,
             indent=2,
             separators=(',', ': '),
-            )
-        stream.write('\n')
+            ) + '\n'
+
+    def _save_feed_states(self, feeds, stream):
+        stream.write(self._dump_feed_states(feeds=feeds))
 
     def new_feed(self, name=None, prefix='feed-', **kwargs):
         """Return a new feed, possibly auto-generating a name.
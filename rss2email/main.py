@@ -155,7 +155,7 @@ def run(*args, **kwargs):
     opmlimport_parser.set_defaults(func=_command.opmlimport)
     opmlimport_parser.add_argument(
         'file', metavar='PATH', nargs='?',
-        help='path for imported OPML (defaults to stdin)')
+        help='path or URL for imported OPML (defaults to stdin)')
 
     opmlexport_parser = subparsers.add_parser(
         'opmlexport', help=_command.opmlexport.__doc__.splitlines()[0])
@@ -23,6 +23,7 @@
 """Odds and ends
 """
 
+import functools as _functools
 import importlib as _importlib
 import sys as _sys
 import threading as _threading
@@ -121,7 +122,17 @@ def import_function(name):
     Traceback (most recent call last):
       ...
     ValueError: rss2email.util.no_space
+
+    Successful imports are remembered, so feeds sharing a
+    post-process hook only import it once.
+
+    >>> import_function('rss2email.util import_name') is import_name
+    True
     """
+    return _import_function(name)
+
+@_functools.lru_cache(maxsize=128)
+def _import_function(name):
     try:
         module_name,function_name = name.split(' ', 1)
     except ValueError as e:
@@ -10,7 +10,9 @@ import os as _os
 import platform
 import re as _re
 import multiprocessing
+import socketserver
 import subprocess
+import threading
 import unittest
 import mailbox
 import http.server
@@ -23,7 +25,7 @@ from typing import List
 sys.path.insert(0, _os.path.dirname(__file__))
 from util.execcontext import r2e_path, ExecContext
 from util.tempmaildir import TemporaryMaildir
-from util.tempsendmail import TemporarySendmail
+from util.tempsendmail import TemporarySendmail, TemporarySMTPSendmail
 
 # Directory containing test feed data/configs
 test_dir = str(Path(__file__).absolute().parent.joinpath("data"))
@@ -242,11 +244,19 @@ class TestFetch(unittest.TestCase):
     "Retrieving feeds from servers"
     def test_delay(self):
         "Waits before fetching repeatedly from the same server"
+        self._test_delay(fetch_threads=1)
+
+    def test_delay_fetch_threads(self):
+        "Waits between fetches from the same server even in parallel"
+        self._test_delay(fetch_threads=3)
+
+    def _test_delay(self, fetch_threads):
         wait_time = 0.3
         delay_cfg = """[DEFAULT]
         to = example@example.com
         same-server-fetch-interval = {}
-        """.format(wait_time)
+        fetch-threads = {}
+        """.format(wait_time, fetch_threads)
 
         num_requests = 3
 
@@ -368,6 +378,48 @@ class TestFetch(unittest.TestCase):
                 self.assertIn("seen", content["feeds"][0])
         self.assertEqual(queue.get(), "done")
 
+    def test_unchanged_data_not_rewritten(self):
+        "An unchanged data file is left in place"
+        standard_cfg = """[DEFAULT]
+        to = example@example.com"""
+
+        with ExecContext(standard_cfg) as ctx:
+            ctx.call("run", "--no-send")
+            inode = ctx.data_path.stat().st_ino
+            ctx.call("run", "--no-send")
+            self.assertEqual(inode, ctx.data_path.stat().st_ino)
+
+    def test_not_modified(self):
+        "A 304 reply keeps the modification time for the next fetch"
+        standard_cfg = """[DEFAULT]
+        to = example@example.com"""
+
+        queue = multiprocessing.Queue()
+        webserver_proc = multiprocessing.Process(
+            target=webserver_for_test_send, args=(queue,))
+        webserver_proc.start()
+        port = queue.get()
+
+        try:
+            with ExecContext(standard_cfg) as ctx:
+                ctx.call(
+                    "add", 'test',
+                    'http://127.0.0.1:{port}/disqus/feed.rss'.format(
+                        port=port))
+                modified = []
+                for i in range(2):
+                    queue.put("next")
+                    p = ctx.call("run", "--no-send")
+                    self.assertEqual(p.returncode, 0, p.stderr)
+                    with ctx.data_path.open('r') as f:
+                        content = json.load(f)
+                    modified.append(content["feeds"][0]["modified"])
+        finally:
+            queue.put("stop")
+        self.assertIsNotNone(modified[0])
+        self.assertEqual(modified[1], modified[0])
+
+
 
 def webserver_for_test_send(queue):
     httpd = http.server.HTTPServer(('', 0), NoLogHandler)
@@ -420,6 +472,62 @@ class TestSend(unittest.TestCase):
             self.assertEqual(len([msg for msg in msgs if msg["subject"] == "split massive package into modules"]), 1)
             self.assertEqual(len([msg for msg in msgs if msg["subject"] == "Re: new maintainer and mailing list for rss2email"]), 4)
 
+    def test_fetch_threads(self):
+        "Feeds fetched in parallel are all processed and sent"
+        with TemporaryMaildir() as maildir:
+            maildir_cfg = """\
+                [DEFAULT]
+                to = example@example.com
+                email-protocol = maildir
+                maildir-path = {maildir_path}
+                maildir-mailbox = {maildir_mailbox}
+                fetch-threads = 2
+                """.format(maildir_path=maildir.path,
+                           maildir_mailbox=maildir.inbox_name)
+
+            with ExecContext(maildir_cfg) as ctx:
+                for name in ['gmane', 'fastmailstatus']:
+                    self.httpd_queue.put("next")
+                    ctx.call(
+                        "add",
+                        name,
+                        'http://127.0.0.1:{port}/{name}/feed.rss'.format(
+                            port=self.httpd_port, name=name))
+                p = ctx.call("run")
+                self.assertEqual(p.returncode, 0, p.stderr)
+
+            self.assertEqual(len(maildir.inbox.values()), 15)
+
+    def test_max_entries(self):
+        "Only the first max-entries entries of a feed are sent"
+        with TemporaryMaildir() as maildir:
+            maildir_cfg = """\
+                [DEFAULT]
+                to = example@example.com
+                email-protocol = maildir
+                maildir-path = {maildir_path}
+                maildir-mailbox = {maildir_mailbox}
+                max-entries = 3
+                """.format(maildir_path=maildir.path,
+                           maildir_mailbox=maildir.inbox_name)
+
+            with ExecContext(maildir_cfg) as ctx:
+                self.httpd_queue.put("next")
+                ctx.call(
+                    "add",
+                    "fastmailstatus",
+                    'http://127.0.0.1:{port}/fastmailstatus/feed.rss'.format(
+                        port=self.httpd_port))
+                p = ctx.call("run")
+                self.assertEqual(p.returncode, 0, p.stderr)
+
+            subjects = sorted(msg["subject"] for msg in maildir.inbox.values())
+            self.assertEqual(subjects, [
+                "Login & sessions - Up",
+                "Login & sessions - Warning",
+                "Support System - Up",
+                ])
+
     def _test_sendmail(self, exitcode, shouldlog, verbose='error'):
         with TemporarySendmail(exitcode) as sendmail:
             cfg = """\
@@ -454,6 +562,206 @@ class TestSend(unittest.TestCase):
     def test_sendmail_debug(self):
         self._test_sendmail(exitcode=0, shouldlog=True, verbose='debug')
 
+    def test_sendmail_batch(self):
+        "sendmail-batch delivers a whole run through one sendmail process"
+        with TemporarySMTPSendmail() as sendmail:
+            cfg = """\
+            [DEFAULT]
+            to = example@example.com
+            from = Feeds <feeds@example.com>
+            sendmail = {sendmail}
+            sendmail-batch = True
+            """.format(sendmail=sendmail.bin)
+
+            with ExecContext(cfg) as ctx:
+                self.httpd_queue.put("next")
+                ctx.call(
+                    "add",
+                    'test',
+                    'http://127.0.0.1:{port}/gmane/feed.rss'.format(
+                        port=self.httpd_port))
+                p = ctx.call("run")
+                self.assertEqual(p.returncode, 0, p.stderr)
+
+            log = sendmail.log.read_text().splitlines()
+        # the sender is passed like for single messages
+        self.assertEqual(
+            log,
+            ['START -bs -F Feeds -f feeds@example.com'] + ['MESSAGE'] * 5)
+
+    def test_sendmail_batch_fallback(self):
+        "sendmail-batch falls back to one process per message without -bs"
+        with TemporarySMTPSendmail(bs=False) as sendmail:
+            cfg = """\
+            [DEFAULT]
+            to = example@example.com
+            from = Feeds <feeds@example.com>
+            sendmail = {sendmail}
+            sendmail-batch = True
+            """.format(sendmail=sendmail.bin)
+
+            with ExecContext(cfg) as ctx:
+                self.httpd_queue.put("next")
+                ctx.call(
+                    "add",
+                    'test',
+                    'http://127.0.0.1:{port}/gmane/feed.rss'.format(
+                        port=self.httpd_port))
+                p = ctx.call("run")
+                self.assertEqual(p.returncode, 0, p.stderr)
+
+            log = sendmail.log.read_text().splitlines()
+        self.assertEqual(log[0], 'START -bs -F Feeds -f feeds@example.com')
+        self.assertEqual(
+            log[1::2],
+            ['START -F Feeds -f feeds@example.com example@example.com'] * 5)
+        self.assertEqual(log[2::2], ['MESSAGE'] * 5)
+
+    def test_send_threads(self):
+        "send-threads sends a feed's messages in parallel"
+        with TemporarySMTPSendmail() as sendmail:
+            cfg = """\
+            [DEFAULT]
+            to = example@example.com
+            sendmail = {sendmail}
+            sendmail-batch = True
+            send-threads = 3
+            """.format(sendmail=sendmail.bin)
+
+            with ExecContext(cfg) as ctx:
+                self.httpd_queue.put("next")
+                ctx.call(
+                    "add",
+                    'test',
+                    'http://127.0.0.1:{port}/gmane/feed.rss'.format(
+                        port=self.httpd_port))
+                p = ctx.call("run")
+                self.assertEqual(p.returncode, 0, p.stderr)
+
+            log = sendmail.log.read_text().splitlines()
+        self.assertEqual(log.count('MESSAGE'), 5)
+        # one sendmail process per thread that actually sent something
+        starts = [line for line in log if line.startswith('START -bs ')]
+        self.assertIn(len(starts), (1, 2, 3))
+
+    def test_send_threads_shared(self):
+        "send-threads reuses the same threads for all the feeds of a run"
+        with TemporarySMTPSendmail() as sendmail:
+            cfg = """\
+            [DEFAULT]
+            to = example@example.com
+            sendmail = {sendmail}
+            sendmail-batch = True
+            send-threads = 2
+            """.format(sendmail=sendmail.bin)
+
+            with ExecContext(cfg) as ctx:
+                for name in ['gmane', 'fastmailstatus']:
+                    self.httpd_queue.put("next")
+                    ctx.call(
+                        "add",
+                        name,
+                        'http://127.0.0.1:{port}/{name}/feed.rss'.format(
+                            port=self.httpd_port, name=name))
+                p = ctx.call("run")
+                self.assertEqual(p.returncode, 0, p.stderr)
+
+            log = sendmail.log.read_text().splitlines()
+        self.assertEqual(log.count('MESSAGE'), 15)
+        starts = [line for line in log if line.startswith('START -bs ')]
+        self.assertIn(len(starts), (1, 2))
+
+
+class TimeoutSMTPHandler(socketserver.StreamRequestHandler):
+    """Accept one message per connection, then reply like an idle timeout
+
+    With ``refuse`` set on the server, every sender is rejected instead.
+    """
+    def reply(self, line):
+        self.wfile.write(line + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply(b'220 localhost ESMTP')
+        sent = False
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command == b'MAIL' and self.server.refuse:
+                self.reply(b'550 5.7.1 Rejected')
+            elif command == b'MAIL' and sent:
+                self.reply(b'421 4.4.2 Error: timeout exceeded')
+                return
+            elif command == b'DATA':
+                self.reply(b'354 End data with <CR><LF>.<CR><LF>')
+                for line in self.rfile:
+                    if line == b'.\r\n':
+                        break
+                self.server.messages += 1
+                sent = True
+                self.reply(b'250 OK')
+            elif command == b'QUIT':
+                self.reply(b'221 Bye')
+                return
+            else:
+                self.reply(b'250 OK')
+
+class TestSMTPSession(unittest.TestCase):
+    "Reuse SMTP connections within an email Session"
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(
+            ('127.0.0.1', 0), TimeoutSMTPHandler)
+        self.server.daemon_threads = True
+        self.server.connections = self.server.messages = 0
+        self.server.refuse = False
+        threading.Thread(target=self.server.serve_forever).start()
+        self.config = _rss2email_config.Config()
+        self.config.read_dict(_rss2email_config.CONFIG)
+        self.config.set(
+            'DEFAULT', 'smtp-server',
+            '127.0.0.1:{}'.format(self.server.server_address[1]))
+        self.message = _rss2email_email.get_message(
+            sender='John <jdoe@a.com>', recipient='z@olympus.org',
+            subject='Homage', body='You\'re great!\n',
+            content_type='plain', config=self.config)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reconnect_after_timeout(self):
+        "A connection timed out with 421 is reopened"
+        with _rss2email_email.Session():
+            for _ in range(3):
+                _rss2email_email.smtp_send(
+                    recipient='z@olympus.org', message=self.message,
+                    config=self.config)
+        self.assertEqual(self.server.messages, 3)
+        self.assertEqual(self.server.connections, 3)
+
+    def test_lmtp_reconnect_after_timeout(self):
+        "An LMTP connection timed out with 421 is reopened"
+        self.config.set('DEFAULT', 'lmtp-server', '127.0.0.1')
+        self.config.set(
+            'DEFAULT', 'lmtp-port', str(self.server.server_address[1]))
+        with _rss2email_email.Session():
+            for _ in range(3):
+                _rss2email_email.lmtp_send(
+                    recipient='z@olympus.org', message=self.message,
+                    config=self.config)
+        self.assertEqual(self.server.messages, 3)
+        self.assertEqual(self.server.connections, 3)
+
+    def test_send_error(self):
+        "A rejected message raises an rss2email error"
+        self.server.refuse = True
+        with _rss2email_email.Session():
+            with self.assertRaises(_rss2email_error.SMTPConnectionError) as cm:
+                _rss2email_email.smtp_send(
+                    recipient='z@olympus.org', message=self.message,
+                    config=self.config)
+        self.assertIsInstance(
+            cm.exception.__cause__, _rss2email_email._smtplib.SMTPSenderRefused)
+        self.assertEqual(self.server.connections, 1)
 
 class TestFeedConfig(unittest.TestCase):
     def test_user_agent_substitutions(self):
@@ -574,5 +882,42 @@ class TestOPML(unittest.TestCase):
 
             self.assertEqual(content["feeds"][0]["name"], self.feed_name)
 
+    def test_opml_import_url(self):
+        queue = multiprocessing.Queue()
+        webserver_proc = multiprocessing.Process(target=webserver_for_test_if_fetch, args=(queue, 10))
+        webserver_proc.start()
+        port = queue.get()
+
+        with ExecContext(self.cfg) as ctx:
+            ctx.call("opmlimport", 'http://127.0.0.1:{port}/opml/feeds.opml'.format(port = port))
+
+            with ctx.data_path.open('r') as f:
+                content = json.load(f)
+
+            self.assertEqual(content["feeds"][0]["name"], self.feed_name)
+        self.assertEqual(queue.get(), "done")
+
+    def test_opml_import_nested(self):
+        opml_content = b"""<?xml version="1.0" encoding="UTF-8"?>
+<opml version="1.0">
+<body>
+<outline text="News">
+<outline type="rss" text="a &amp; b" xmlUrl="https://example.com/a.xml?x=1&amp;y=2"/>
+</outline>
+</body>
+</opml>
+"""
+        with ExecContext(self.cfg) as ctx:
+            ctx.opml_path.write_bytes(opml_content)
+            ctx.call("opmlimport", str(ctx.opml_path))
+
+            with ctx.data_path.open('r') as f:
+                content = json.load(f)
+            self.assertEqual(len(content["feeds"]), 1)
+            self.assertEqual(content["feeds"][0]["name"], "a-b")
+            self.assertIn(
+                "url = https://example.com/a.xml?x=1&y=2",
+                ctx.cfg_path.read_text())
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,5 @@
 import os
+import sys
 import tempfile
 from pathlib import Path
 
@@ -28,3 +29,62 @@ class TemporarySendmail:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.cleanup()
+
+
+class TemporarySMTPSendmail:
+    """A fake sendmail that speaks SMTP on stdin/stdout (``-bs``)
+
+    Every invocation is logged to `self.log`, followed by the messages
+    it received.  With `bs=False` it rejects ``-bs`` like an MTA that
+    does not support it, and reads a single message from stdin instead.
+    """
+    def __init__(self, bs=True):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.log = Path(self._tmpdir.name) / 'log'
+
+        with tempfile.NamedTemporaryFile(
+                dir=self._tmpdir.name, delete=False) as _bin:
+            _bin.write(b'''#!%s
+import sys
+log = open(%r, 'ab')
+log.write(b'START ' + ' '.join(sys.argv[1:]).encode() + b'\\n')
+if '-bs' not in sys.argv[1:]:
+    sys.stdin.buffer.read()
+    log.write(b'MESSAGE\\n')
+    sys.exit(0)
+if not %r:
+    print('sendmail: unsupported option -bs')
+    sys.exit(64)
+def reply(line):
+    sys.stdout.buffer.write(line + b'\\r\\n')
+    sys.stdout.buffer.flush()
+reply(b'220 fake sendmail')
+data = False
+for line in sys.stdin.buffer:
+    if data:
+        if line.rstrip(b'\\r\\n') == b'.':
+            data = False
+            log.write(b'MESSAGE\\n')
+            reply(b'250 queued')
+        continue
+    command = line[:4].upper()
+    if command == b'DATA':
+        data = True
+        reply(b'354 go ahead')
+    elif command == b'QUIT':
+        reply(b'221 bye')
+        break
+    else:
+        reply(b'250 ok')
+''' % (os.fsencode(sys.executable), str(self.log), bs))
+        self.bin = Path(_bin.name)
+        os.chmod(str(self.bin), 0o700)
+
+    def cleanup(self):
+        self._tmpdir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cleanup()